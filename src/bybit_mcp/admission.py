@@ -0,0 +1,82 @@
+"""AIMD admission control for in-flight Bybit requests.
+
+The concurrency limit grows additively while Bybit answers normally and is
+cut multiplicatively when it signals pressure: HTTP 429, a rate-limit
+retCode, or an ``X-Bapi-Limit-Status`` at or below 10% of ``X-Bapi-Limit``.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Mapping
+
+# Bybit retCodes meaning "slow down": too many visits, IP rate limit
+RATE_LIMIT_CODES = frozenset({10006, 10018})
+
+_LOW_QUOTA_RATIO = 0.1
+
+
+class AdmissionController:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int = 10,
+        minimum: int = 2,
+        maximum: int = 40,
+        alpha: float = 0.5,
+        beta: float = 0.5,
+        target_latency: float = 1.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.beta = beta
+        self.target_latency = target_latency
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._condition: asyncio.Condition | None = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait until fewer than ``limit`` requests are in flight, then hold a slot."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def increase(self) -> None:
+        self.limit = min(self.maximum, self.limit + self.alpha)
+
+    def decrease(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.beta)
+
+    def observe(
+        self,
+        headers: Mapping[str, str],
+        ret_code: int | None,
+        latency: float,
+    ) -> None:
+        """Adjust the limit from one response's rate-limit headers, retCode and latency."""
+        if ret_code in RATE_LIMIT_CODES or _quota_low(headers):
+            self.decrease()
+        elif ret_code == 0 and latency < self.target_latency:
+            self.increase()
+
+
+def _quota_low(headers: Mapping[str, str]) -> bool:
+    remaining = headers.get("X-Bapi-Limit-Status")
+    limit = headers.get("X-Bapi-Limit")
+    if not remaining or not limit:
+        return False
+    try:
+        return int(remaining) <= int(limit) * _LOW_QUOTA_RATIO
+    except ValueError:
+        return False
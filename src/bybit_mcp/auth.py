@@ -7,13 +7,22 @@ Two authentication mechanisms coexist:
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import heapq
+import hmac
+import os
 import secrets
+import string
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, deque
 from html import escape as html_escape
+from typing import Any
 from urllib.parse import urlencode
 
 import jwt
+from jwt.algorithms import HMACAlgorithm
 from mcp.server.auth.provider import (
     AccessToken,
     AuthorizationCode,
@@ -25,46 +34,261 @@ from mcp.server.auth.provider import (
 )
 from mcp.shared.auth import OAuthClientInformationFull, OAuthToken
 
+from bybit_mcp.utils.serialization import dumpb, loads
+
 # JWT config
 _ACCESS_TOKEN_TTL = 3600  # 1 hour
 _REFRESH_TOKEN_TTL = 7 * 24 * 3600  # 7 days
 _AUTH_CODE_TTL = 600  # 10 minutes
+# The only algorithm issued or accepted. Tokens are signed and verified by this
+# process alone, so a shared HMAC secret suffices (RS256 is not supported); every
+# decode pins it, so "alg": "none" and algorithm-confusion tokens are rejected
 _JWT_ALGORITHM = "HS256"
+_JWT_ISSUER = "bybit-mcp"
+# Shared by every decode/encode instead of rebuilding the list and claims
+_DECODE_KWARGS = {"algorithms": [_JWT_ALGORITHM], "issuer": _JWT_ISSUER, "audience": _JWT_ISSUER}
+_BASE_PAYLOAD = {"iss": _JWT_ISSUER, "aud": _JWT_ISSUER}
+# Claims every token we accept must carry; checked once during decoding so
+# callers can index the payload directly
+_REQUIRED_CLAIMS = ("sub", "type", "exp", "jti")
+# Verified JWT access tokens remembered per instance (LRU beyond this)
+_VERIFIED_TOKEN_CACHE_MAX = 1024
+# Header of every token we issue; identical to what PyJWT emits for HS256
+_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+
+# Space-joined scope strings keyed by scope tuple; clients reuse a handful of sets
+_SCOPE_STRING_CACHE: dict[tuple[str, ...], str] = {}
+_SCOPE_STRING_CACHE_MAX = 128
+
+
+def _scope_str(scopes: list[str]) -> str | None:
+    if not scopes:
+        return None
+    key = tuple(scopes)
+    value = _SCOPE_STRING_CACHE.get(key)
+    if value is None:
+        if len(_SCOPE_STRING_CACHE) >= _SCOPE_STRING_CACHE_MAX:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _SCOPE_STRING_CACHE[next(iter(_SCOPE_STRING_CACHE))]
+        value = _SCOPE_STRING_CACHE[key] = " ".join(scopes)
+    return value
+
+
+def _token_digest(token: str) -> bytes:
+    """Fixed-size cache key for a bearer token."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+# ---------------------------------------------------------------------------
+# Random identifiers
+# ---------------------------------------------------------------------------
+
+# Unpadded base64 length per byte count; slicing the padded output drops the
+# trailing "=" without the extra rstrip() allocation
+_URLSAFE_LEN = {16: 22, 32: 43}
+
+
+def _fast_urlsafe(nbytes: int = 32) -> str:
+    """Equivalent of secrets.token_urlsafe(nbytes) with one less copy."""
+    length = _URLSAFE_LEN.get(nbytes) or (nbytes * 4 + 2) // 3
+    return base64.urlsafe_b64encode(os.urandom(nbytes))[:length].decode("ascii")
+
+
+_JTI_BYTES = 16
+_JTI_POOL_SIZE = _JTI_BYTES * 1024
+_jti_lock = threading.Lock()
+_jti_pool = b""
+_jti_offset = 0
+
+
+def _reset_jti_pool() -> None:
+    global _jti_pool, _jti_offset
+    _jti_pool = b""
+    _jti_offset = 0
+
+
+# A forked child must never hand out the parent's remaining random bytes
+os.register_at_fork(after_in_child=_reset_jti_pool)
+
+
+def _fresh_jti() -> str:
+    """Return a random 128-bit jti, sliced from one urandom read per 1024 ids."""
+    global _jti_pool, _jti_offset
+    with _jti_lock:
+        if _jti_offset + _JTI_BYTES > len(_jti_pool):
+            _jti_pool = os.urandom(_JTI_POOL_SIZE)
+            _jti_offset = 0
+        chunk = _jti_pool[_jti_offset:_jti_offset + _JTI_BYTES]
+        _jti_offset += _JTI_BYTES
+    return base64.urlsafe_b64encode(chunk)[:_URLSAFE_LEN[_JTI_BYTES]].decode("ascii")
 
 
 # ---------------------------------------------------------------------------
-# Rate limiter (sliding window)
+# Rate limiter (token bucket)
 # ---------------------------------------------------------------------------
 
 
+class _Bucket:
+    __slots__ = ("tokens", "last")
+
+    def __init__(self, tokens: float, last: float) -> None:
+        self.tokens = tokens
+        self.last = last
+
+
 class RateLimiter:
-    """Simple in-memory sliding-window rate limiter."""
+    """Simple in-memory token-bucket rate limiter.
+
+    Each key may burst up to ``max_requests`` and regains capacity at
+    ``max_requests / window_seconds`` per second: O(1) per check, with no
+    per-request history kept.
+    """
 
     def __init__(self, max_requests: int, window_seconds: int) -> None:
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._timestamps: dict[str, list[float]] = defaultdict(list)
-
-    def check(self, key: str) -> bool:
+        self._rate = max_requests / window_seconds
+        self._buckets: dict[int, _Bucket] = {}
+        # Keys whose bucket has refilled completely are dropped once per window
+        self._next_sweep = time.monotonic() + window_seconds
+
+    @staticmethod
+    def _key_id(key: str | int) -> int:
+        """Map arbitrary string keys to a fixed-size 64-bit int; ints pass through."""
+        if isinstance(key, int):
+            return key
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+    def check(self, key: str | int) -> bool:
         """Return True if the request is allowed, False if rate-limited."""
+        key = self._key_id(key)
         now = time.monotonic()
-        cutoff = now - self.window_seconds
-        # Prune expired timestamps
-        self._timestamps[key] = [t for t in self._timestamps[key] if t > cutoff]
-        if len(self._timestamps[key]) >= self.max_requests:
+        if now >= self._next_sweep:
+            self._sweep(now - self.window_seconds)
+            self._next_sweep = now + self.window_seconds
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.max_requests, now)
+        else:
+            bucket.tokens = min(self.max_requests, bucket.tokens + (now - bucket.last) * self._rate)
+            bucket.last = now
+        if bucket.tokens < 1:
             return False
-        self._timestamps[key].append(now)
+        bucket.tokens -= 1
         return True
 
+    def _sweep(self, cutoff: float) -> None:
+        """Forget keys idle for a whole window; a fresh bucket starts just as full."""
+        stale = [key for key, bucket in self._buckets.items() if bucket.last <= cutoff]
+        for key in stale:
+            del self._buckets[key]
+
 
-# Global rate limiter: max 5 registrations per 10 minutes
+# Global rate limiter: bursts of 5 registrations, one more every 2 minutes
 _registration_limiter = RateLimiter(max_requests=5, window_seconds=600)
 
 
+# ---------------------------------------------------------------------------
+# Revoked token registry (bloom filter + expiring exact map)
+# ---------------------------------------------------------------------------
+
+
+class RevokedTokens:
+    """Revoked JWT ids, bounded by token lifetime.
+
+    A fixed-size bloom filter answers "definitely not revoked" for the common
+    case; the exact jti -> exp map confirms hits and lets entries be dropped
+    once the token they belong to has expired anyway.
+    """
+
+    _NUM_BITS = 1 << 19  # 64 KiB bitmap
+    _NUM_HASHES = 4
+    # Expired entries are swept at most this often, so a burst of revocations
+    # doesn't rescan the map and rebuild the filter on every add
+    _SWEEP_INTERVAL = 60.0
+
+    def __init__(self) -> None:
+        self._bloom = bytearray(self._NUM_BITS // 8)
+        self._exact: dict[str, float] = {}
+        self._next_sweep = time.time() + self._SWEEP_INTERVAL
+
+    def _bit_positions(self, jti: str) -> list[int]:
+        digest = hashlib.blake2b(jti.encode(), digest_size=4 * self._NUM_HASHES).digest()
+        return [
+            int.from_bytes(digest[i:i + 4], "little") % self._NUM_BITS
+            for i in range(0, 4 * self._NUM_HASHES, 4)
+        ]
+
+    def _set_bits(self, jti: str) -> None:
+        for pos in self._bit_positions(jti):
+            self._bloom[pos >> 3] |= 1 << (pos & 7)
+
+    def add(self, jti: str, exp: float) -> None:
+        now = time.time()
+        if now >= self._next_sweep:
+            self.cleanup(now)
+            self._next_sweep = now + self._SWEEP_INTERVAL
+        self._set_bits(jti)
+        self._exact[jti] = exp
+
+    def __contains__(self, jti: object) -> bool:
+        if not isinstance(jti, str):
+            return False
+        for pos in self._bit_positions(jti):
+            if not self._bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return jti in self._exact
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def cleanup(self, now: float | None = None) -> None:
+        """Forget revocations whose tokens have expired and rebuild the filter."""
+        now = time.time() if now is None else now
+        expired = [jti for jti, exp in self._exact.items() if exp <= now]
+        if not expired:
+            return
+        for jti in expired:
+            del self._exact[jti]
+        self._bloom = bytearray(self._NUM_BITS // 8)
+        for jti in self._exact:
+            self._set_bits(jti)
+
+
 class InvalidPINError(ValueError):
     """Raised when the consent PIN is wrong or brute-force limit exceeded."""
 
 
+class PendingConsent:
+    """A consent awaiting approval, with its own PIN failure counter."""
+
+    __slots__ = ("client", "params", "pin_failures", "created_at")
+
+    def __init__(
+        self,
+        client: OAuthClientInformationFull,
+        params: AuthorizationParams,
+        pin_failures: int = 0,
+        created_at: float | None = None,
+    ) -> None:
+        self.client = client
+        self.params = params
+        self.pin_failures = pin_failures
+        self.created_at = time.time() if created_at is None else created_at
+
+    def expired(self, now: float) -> bool:
+        return self.created_at + _AUTH_CODE_TTL < now
+
+
 class BybitOAuthProvider:
     """Full OAuth 2.1 provider with PKCE + static API key support."""
 
@@ -75,19 +299,38 @@ class BybitOAuthProvider:
         oauth_secret: str,
         api_key: str = "",
         consent_pin: str = "",
+        use_jwt: bool = False,
     ) -> None:
         self.oauth_secret = oauth_secret
         self.api_key = api_key
+        # Encoded once; compared against each presented bearer token
+        self._api_key_bytes = api_key.encode() if api_key else b""
         self.consent_pin = consent_pin
+        self._consent_pin_bytes = consent_pin.encode()
+        # Access tokens are opaque and verified by dict lookup unless use_jwt is
+        # set (needed when several instances must accept each other's tokens).
+        # Refresh tokens are always JWTs so they survive restarts.
+        self.use_jwt = use_jwt
         # In-memory stores (stateless per-instance; JWTs survive restarts)
         self.clients: dict[str, OAuthClientInformationFull] = {}
         self.auth_codes: dict[str, AuthorizationCode] = {}
-        # Pending consent sessions: consent_id -> (client, params)
-        self.pending_consents: dict[str, tuple[OAuthClientInformationFull, AuthorizationParams]] = {}
-        # Revoked token JTIs (for token revocation)
-        self.revoked_jtis: set[str] = set()
-        # PIN brute-force protection: consent_id -> failure count
-        self._pin_failures: dict[str, int] = {}
+        # Min-heap of (expires_at, code) for sweeping abandoned authorization codes
+        self._auth_code_expiry: list[tuple[float, str]] = []
+        self.access_tokens: dict[str, AccessToken] = {}
+        # Pending consent sessions (incl. PIN brute-force counter): consent_id -> record
+        self.pending_consents: dict[str, PendingConsent] = {}
+        # Consent ids in creation order; with one fixed TTL that is also expiry
+        # order, so cleanup pops from the left and stops at the first live entry
+        self._consent_order: deque[str] = deque()
+        # Revoked token JTIs (for token revocation), kept until the token expires
+        self.revoked_jtis = RevokedTokens()
+        # Verified JWT access tokens keyed by a digest of the raw token, so
+        # repeat bearers skip HMAC and claim checks: hash -> (token, jti)
+        self._verified_tokens: OrderedDict[bytes, tuple[AccessToken, str]] = OrderedDict()
+        # HMAC key prepared (as bytes) once instead of on every encode/decode
+        self._signing_key = HMACAlgorithm(HMACAlgorithm.SHA256).prepare_key(oauth_secret)
+        # PyJWT only handles tokens whose header differs from the one we issue
+        self._jwt_api = jwt.PyJWT(options={"require": list(_REQUIRED_CLAIMS)})
 
     # ------------------------------------------------------------------
     # Client management
@@ -97,7 +340,7 @@ class BybitOAuthProvider:
         return self.clients.get(client_id)
 
     async def register_client(self, client_info: OAuthClientInformationFull) -> None:
-        # Rate-limit registrations globally (5 per 10 min)
+        # Rate-limit registrations globally (burst of 5, refilling 5 per 10 min)
         if not _registration_limiter.check("global"):
             raise RegistrationError(
                 error="invalid_client_metadata",
@@ -116,8 +359,10 @@ class BybitOAuthProvider:
         params: AuthorizationParams,
     ) -> str:
         """Store pending consent and return consent page URL."""
-        consent_id = secrets.token_urlsafe(32)
-        self.pending_consents[consent_id] = (client, params)
+        self.cleanup_expired_consents()
+        consent_id = _fast_urlsafe(32)
+        self.pending_consents[consent_id] = PendingConsent(client, params)
+        self._consent_order.append(consent_id)
         return f"/consent?id={consent_id}"
 
     def approve_consent(self, consent_id: str, pin: str = "") -> str:
@@ -126,33 +371,43 @@ class BybitOAuthProvider:
         If a consent_pin is configured, the caller must provide the correct PIN.
         Raises InvalidPINError on wrong PIN (max 5 attempts per consent).
         """
-        if consent_id not in self.pending_consents:
+        self.cleanup_expired_consents()
+        pending = self.pending_consents.get(consent_id)
+        if pending is None:
+            raise ValueError("Invalid or expired consent")
+        if pending.expired(time.time()):
+            del self.pending_consents[consent_id]
             raise ValueError("Invalid or expired consent")
 
         # Verify PIN when configured
         if self.consent_pin:
             # Check brute-force limit
-            failures = self._pin_failures.get(consent_id, 0)
-            if failures >= self._MAX_PIN_ATTEMPTS:
-                self.pending_consents.pop(consent_id, None)
-                self._pin_failures.pop(consent_id, None)
+            if pending.pin_failures >= self._MAX_PIN_ATTEMPTS:
+                del self.pending_consents[consent_id]
                 raise InvalidPINError("Too many failed attempts. Authorization cancelled.")
 
-            # Always run compare_digest for uniform timing (no short-circuit)
-            pin_ok = secrets.compare_digest(pin or "", self.consent_pin)
+            # Timing-safe over bytes. Only the PIN length can leak, and the
+            # attempt cap makes that useless; a wrong length is still a failure
+            pin = pin or ""
+            pin_ok = len(pin) == len(self.consent_pin) and secrets.compare_digest(
+                pin.encode(), self._consent_pin_bytes
+            )
             if not pin_ok:
-                self._pin_failures[consent_id] = failures + 1
+                pending.pin_failures += 1
                 raise InvalidPINError("Invalid PIN")
 
-        # PIN passed (or not required) — clean up failure counter and consume consent
-        self._pin_failures.pop(consent_id, None)
-        client, params = self.pending_consents.pop(consent_id)
+        # PIN passed (or not required) — consume consent
+        del self.pending_consents[consent_id]
+        client, params = pending.client, pending.params
 
-        code = secrets.token_urlsafe(32)
+        self.cleanup_expired_auth_codes()
+        code = _fast_urlsafe(32)
+        expires_at = time.time() + _AUTH_CODE_TTL
+        heapq.heappush(self._auth_code_expiry, (expires_at, code))
         self.auth_codes[code] = AuthorizationCode(
             code=code,
             scopes=params.scopes or [],
-            expires_at=time.time() + _AUTH_CODE_TTL,
+            expires_at=expires_at,
             client_id=client.client_id,
             code_challenge=params.code_challenge,
             redirect_uri=params.redirect_uri,
@@ -168,10 +423,11 @@ class BybitOAuthProvider:
 
     def deny_consent(self, consent_id: str) -> str:
         """Deny a consent request. Returns redirect URL with error."""
-        if consent_id not in self.pending_consents:
+        pending = self.pending_consents.pop(consent_id, None)
+        if pending is None:
             raise ValueError("Invalid or expired consent")
 
-        _client, params = self.pending_consents.pop(consent_id)
+        params = pending.params
         return construct_redirect_uri(
             str(params.redirect_uri),
             error="access_denied",
@@ -188,7 +444,11 @@ class BybitOAuthProvider:
         client: OAuthClientInformationFull,
         authorization_code: str,
     ) -> AuthorizationCode | None:
-        return self.auth_codes.get(authorization_code)
+        code = self.auth_codes.get(authorization_code)
+        if code is not None and code.expires_at < time.time():
+            self.auth_codes.pop(authorization_code, None)
+            return None
+        return code
 
     async def exchange_authorization_code(
         self,
@@ -200,12 +460,7 @@ class BybitOAuthProvider:
 
         scopes = authorization_code.scopes
 
-        access_token = self._create_jwt(
-            sub=client.client_id,
-            token_type="access",
-            scopes=scopes,
-            ttl=_ACCESS_TOKEN_TTL,
-        )
+        access_token = self._issue_access_token(client.client_id, scopes)
         refresh_token = self._create_jwt(
             sub=client.client_id,
             token_type="refresh",
@@ -217,7 +472,7 @@ class BybitOAuthProvider:
             access_token=access_token,
             token_type="Bearer",
             expires_in=_ACCESS_TOKEN_TTL,
-            scope=" ".join(scopes) if scopes else None,
+            scope=_scope_str(scopes),
             refresh_token=refresh_token,
         )
 
@@ -230,16 +485,14 @@ class BybitOAuthProvider:
         client: OAuthClientInformationFull,
         refresh_token: str,
     ) -> RefreshToken | None:
-        payload = self._decode_jwt(refresh_token)
-        if not payload or payload.get("type") != "refresh":
-            return None
-        if payload.get("sub") != client.client_id:
+        payload = self._decode_jwt(refresh_token, expected_type="refresh", expected_sub=client.client_id)
+        if payload is None:
             return None
         return RefreshToken(
             token=refresh_token,
             client_id=payload["sub"],
             scopes=payload.get("scopes", []),
-            expires_at=payload.get("exp"),
+            expires_at=payload["exp"],
         )
 
     async def exchange_refresh_token(
@@ -252,15 +505,10 @@ class BybitOAuthProvider:
 
         # Revoke the old refresh token (rotation)
         old_payload = self._decode_jwt(refresh_token.token, skip_revocation_check=True)
-        if old_payload and old_payload.get("jti"):
-            self.revoked_jtis.add(old_payload["jti"])
+        if old_payload is not None:
+            self._revoke_jti(old_payload)
 
-        access_token = self._create_jwt(
-            sub=client.client_id,
-            token_type="access",
-            scopes=use_scopes,
-            ttl=_ACCESS_TOKEN_TTL,
-        )
+        access_token = self._issue_access_token(client.client_id, use_scopes)
         new_refresh = self._create_jwt(
             sub=client.client_id,
             token_type="refresh",
@@ -272,7 +520,7 @@ class BybitOAuthProvider:
             access_token=access_token,
             token_type="Bearer",
             expires_in=_ACCESS_TOKEN_TTL,
-            scope=" ".join(use_scopes) if use_scopes else None,
+            scope=_scope_str(use_scopes),
             refresh_token=new_refresh,
         )
 
@@ -281,82 +529,211 @@ class BybitOAuthProvider:
     # ------------------------------------------------------------------
 
     async def load_access_token(self, token: str) -> AccessToken | None:
-        # Check static API key first (timing-safe comparison)
-        if self.api_key and secrets.compare_digest(token, self.api_key):
+        # Check static API key first (timing-safe comparison over bytes). The
+        # length is not secret, so a mismatch (e.g. any JWT) skips encoding
+        # the token at all
+        if (
+            self._api_key_bytes
+            and len(token) == len(self.api_key)
+            and secrets.compare_digest(token.encode(), self._api_key_bytes)
+        ):
             return AccessToken(
                 token=token,
                 client_id="api-key",
                 scopes=["all"],
             )
 
-        # Check JWT
-        payload = self._decode_jwt(token)
-        if not payload or payload.get("type") != "access":
+        # Check opaque tokens issued by this instance
+        access_token = self.access_tokens.get(token)
+        if access_token is not None:
+            if access_token.expires_at is not None and access_token.expires_at <= time.time():
+                self.access_tokens.pop(token, None)
+                return None
+            return access_token
+
+        # Check JWT (anything without exactly three segments cannot be one)
+        if token.count(".") != 2:
+            return None
+        key = _token_digest(token)
+        cached = self._verified_tokens.get(key)
+        if cached is not None:
+            access_token, jti = cached
+            if access_token.expires_at > time.time() and jti not in self.revoked_jtis:
+                self._verified_tokens.move_to_end(key)
+                return access_token
+            del self._verified_tokens[key]
+            return None
+
+        payload = self._decode_jwt(token, expected_type="access")
+        if payload is None:
             return None
 
-        return AccessToken(
+        access_token = AccessToken(
             token=token,
-            client_id=payload.get("sub", "unknown"),
+            client_id=payload["sub"],
             scopes=payload.get("scopes", []),
-            expires_at=payload.get("exp"),
+            expires_at=payload["exp"],
         )
+        self._verified_tokens[key] = (access_token, payload["jti"])
+        if len(self._verified_tokens) > _VERIFIED_TOKEN_CACHE_MAX:
+            self._verified_tokens.popitem(last=False)
+        return access_token
 
     # ------------------------------------------------------------------
     # Revocation (jti blacklist)
     # ------------------------------------------------------------------
 
     async def revoke_token(self, token: AccessToken | RefreshToken) -> None:
-        """Revoke a token by adding its jti to the blacklist."""
+        """Revoke a token by dropping it (opaque) or blacklisting its jti (JWT)."""
         raw = token.token
+        if self.access_tokens.pop(raw, None) is not None:
+            return
+        self._verified_tokens.pop(_token_digest(raw), None)
         payload = self._decode_jwt(raw, skip_revocation_check=True)
-        if payload and payload.get("jti"):
-            self.revoked_jtis.add(payload["jti"])
+        if payload is not None:
+            self._revoke_jti(payload)
+
+    def _revoke_jti(self, payload: dict) -> None:
+        self.revoked_jtis.add(payload["jti"], payload["exp"])
 
     # ------------------------------------------------------------------
-    # JWT helpers
+    # Token helpers
     # ------------------------------------------------------------------
 
+    def _issue_access_token(self, sub: str, scopes: list[str]) -> str:
+        """Mint an access token: opaque by default, JWT when use_jwt is set."""
+        if self.use_jwt:
+            return self._create_jwt(
+                sub=sub,
+                token_type="access",
+                scopes=scopes,
+                ttl=_ACCESS_TOKEN_TTL,
+            )
+
+        now = int(time.time())
+        # Drop expired tokens so the store stays bounded by live sessions
+        expired = [
+            t for t, at in self.access_tokens.items()
+            if at.expires_at is not None and at.expires_at <= now
+        ]
+        for t in expired:
+            self.access_tokens.pop(t, None)
+
+        token = _fast_urlsafe(32)
+        self.access_tokens[token] = AccessToken(
+            token=token,
+            client_id=sub,
+            scopes=scopes,
+            expires_at=now + _ACCESS_TOKEN_TTL,
+        )
+        return token
+
     def _create_jwt(self, sub: str, token_type: str, scopes: list[str], ttl: int) -> str:
         now = int(time.time())
         payload = {
+            **_BASE_PAYLOAD,
             "sub": sub,
             "type": token_type,
             "scopes": scopes,
             "iat": now,
             "exp": now + ttl,
-            "iss": "bybit-mcp",
-            "aud": "bybit-mcp",
-            "jti": secrets.token_urlsafe(16),
+            "jti": _fresh_jti(),
         }
-        return jwt.encode(payload, self.oauth_secret, algorithm=_JWT_ALGORITHM)
+        # HS256 with a fixed header is just base64url + one HMAC; hmac.digest is
+        # OpenSSL's one-shot HMAC (no Python-level HMAC object per call)
+        signing_input = _HEADER_B64 + b"." + _b64url_encode(dumpb(payload))
+        signature = hmac.digest(self._signing_key, signing_input, "sha256")
+        return (signing_input + b"." + _b64url_encode(signature)).decode("ascii")
+
+    def _verify_jwt(self, token: str) -> dict | None:
+        """Verify signature and registered claims; return the payload or None."""
+        try:
+            raw = token.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        header_b64, _, rest = raw.partition(b".")
+        payload_b64, _, signature_b64 = rest.partition(b".")
+
+        if header_b64 != _HEADER_B64:
+            # Not a header we emit (other key order, extra fields, other alg):
+            # let PyJWT parse it, still pinned to HS256
+            try:
+                return self._jwt_api.decode(token, self._signing_key, **_DECODE_KWARGS)
+            except jwt.InvalidTokenError:
+                return None
 
-    def _decode_jwt(self, token: str, *, skip_revocation_check: bool = False) -> dict | None:
         try:
-            payload = jwt.decode(
-                token,
-                self.oauth_secret,
-                algorithms=[_JWT_ALGORITHM],
-                issuer="bybit-mcp",
-                audience="bybit-mcp",
-            )
-        except (jwt.InvalidTokenError, jwt.ExpiredSignatureError):
+            signature = _b64url_decode(signature_b64)
+        except ValueError:
+            return None
+        expected = hmac.digest(self._signing_key, header_b64 + b"." + payload_b64, "sha256")
+        if not hmac.compare_digest(expected, signature):
+            return None
+
+        try:
+            payload = loads(_b64url_decode(payload_b64))
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or not all(claim in payload for claim in _REQUIRED_CLAIMS):
+            return None
+
+        now = time.time()
+        exp = payload["exp"]
+        if not isinstance(exp, (int, float)) or exp <= now:
+            return None
+        iat = payload.get("iat")
+        if iat is not None and (not isinstance(iat, (int, float)) or iat > now):
+            return None
+        nbf = payload.get("nbf")
+        if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+            return None
+        if payload.get("iss") != _JWT_ISSUER:
+            return None
+        aud = payload.get("aud")
+        if aud != _JWT_ISSUER and not (isinstance(aud, list) and _JWT_ISSUER in aud):
+            return None
+        return payload
+
+    def _decode_jwt(
+        self,
+        token: str,
+        *,
+        expected_type: str | None = None,
+        expected_sub: str | None = None,
+        skip_revocation_check: bool = False,
+    ) -> dict | None:
+        """Return verified claims, or None if invalid, revoked or not as expected."""
+        payload = self._verify_jwt(token)
+        if payload is None:
+            return None
+        if expected_type is not None and payload["type"] != expected_type:
+            return None
+        if expected_sub is not None and payload["sub"] != expected_sub:
             return None
 
         # Check jti revocation blacklist
-        if not skip_revocation_check and payload.get("jti") in self.revoked_jtis:
+        if not skip_revocation_check and payload["jti"] in self.revoked_jtis:
             return None
 
         return payload
 
+    def cleanup_expired_auth_codes(self) -> None:
+        """Remove authorization codes that expired without being exchanged."""
+        now = time.time()
+        while self._auth_code_expiry and self._auth_code_expiry[0][0] < now:
+            _, code = heapq.heappop(self._auth_code_expiry)
+            self.auth_codes.pop(code, None)
+
     def cleanup_expired_consents(self) -> None:
         """Remove pending consents older than the auth code TTL."""
         now = time.time()
-        expired = [
-            cid for cid, (_, params) in self.pending_consents.items()
-            if hasattr(params, "_created_at") and now - params._created_at > _AUTH_CODE_TTL
-        ]
-        for cid in expired:
-            self.pending_consents.pop(cid, None)
+        order = self._consent_order
+        while order:
+            pending = self.pending_consents.get(order[0])
+            if pending is not None and not pending.expired(now):
+                break
+            # Expired, or already approved/denied
+            self.pending_consents.pop(order.popleft(), None)
 
 
 # ---------------------------------------------------------------------------
@@ -508,9 +885,9 @@ CONSENT_PAGE_HTML = """<!DOCTYPE html>
     <li>Transfer assets between accounts</li>
   </ul>
   <form method="POST">
-    <input type="hidden" name="consent_id" value="{consent_id}">
-    {pin_field}
-    <div class="error-msg {error_class}">{error_msg}</div>
+    <input type="hidden" name="consent_id" value="${consent_id}">
+    ${pin_field}
+    <div class="error-msg ${error_class}">${error_msg}</div>
     <div class="buttons">
       <button type="submit" name="action" value="deny" class="btn btn-deny">Deny</button>
       <button type="submit" name="action" value="approve" class="btn btn-approve">Approve</button>
@@ -519,3 +896,6 @@ CONSENT_PAGE_HTML = """<!DOCTYPE html>
 </div>
 </body>
 </html>"""
+
+# Parsed once at import; rendering is a single substitute() call
+CONSENT_PAGE_TEMPLATE = string.Template(CONSENT_PAGE_HTML)
@@ -0,0 +1,158 @@
+"""Async Bybit v5 REST calls over the shared HTTP client."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+from aiolimiter import AsyncLimiter
+
+from bybit_mcp.admission import RATE_LIMIT_CODES
+from bybit_mcp.config import (
+    admission,
+    get_http_client,
+    order_limiter,
+    position_limiter,
+    private_limiter,
+    public_limiter,
+    require_signer,
+)
+from bybit_mcp.utils.retry import with_retry
+from bybit_mcp.utils.serialization import dumpb, loads
+
+# retCode for failures that never produced a Bybit response body, matching the
+# code of locally rejected orders
+LOCAL_ERROR = -1
+
+
+def _private_limiter(path: str) -> AsyncLimiter:
+    if path.startswith("/v5/order/"):
+        return order_limiter
+    if path.startswith("/v5/position/"):
+        return position_limiter
+    return private_limiter
+
+
+def _retry_after_ms(response: httpx.Response) -> int | None:
+    reset = response.headers.get("X-Bapi-Limit-Reset-Timestamp")
+    if not reset or not reset.isdigit():
+        return None
+    return max(0, int(reset) - time.time_ns() // 1_000_000)
+
+
+async def _dispatch(
+    limiter: AsyncLimiter, send: Callable[[], Awaitable[httpx.Response]]
+) -> dict[str, Any]:
+    """Send one request under the admission controller and rate limiter, then
+    feed the outcome back to the controller and decode the body."""
+    async with admission.slot():
+        async with limiter:
+            started = time.monotonic()
+            response = await send()
+            latency = time.monotonic() - started
+    if response.status_code == 429:
+        admission.decrease()
+    response.raise_for_status()
+    try:
+        data = loads(response.content)
+    except ValueError:
+        # A proxy or maintenance page in place of the API; not worth retrying
+        return {"retCode": LOCAL_ERROR, "retMsg": f"HTTP {response.status_code}: non-JSON response"}
+    ret_code = data.get("retCode")
+    admission.observe(response.headers, ret_code, latency)
+    if ret_code in RATE_LIMIT_CODES:
+        retry_after = _retry_after_ms(response)
+        if retry_after is not None:
+            data["retryAfter"] = retry_after
+    return data
+
+
+async def _request(
+    limiter: AsyncLimiter,
+    send: Callable[[], Awaitable[httpx.Response]],
+    *,
+    idempotent: bool,
+    recover: Callable[[], Awaitable[dict[str, Any] | None]] | None = None,
+) -> dict[str, Any]:
+    """``_dispatch`` under ``with_retry``, reporting a final HTTP error status or
+    transport failure as a Bybit-style body so it reaches ``format_response``
+    like a non-zero retCode."""
+    try:
+        return await with_retry(
+            lambda: _dispatch(limiter, send), idempotent=idempotent, recover=recover
+        )
+    except httpx.TransportError as exc:
+        return {"retCode": LOCAL_ERROR, "retMsg": f"{type(exc).__name__}: {exc}"}
+    except httpx.HTTPStatusError as exc:
+        response = exc.response
+        data: dict[str, Any] = {
+            "retCode": response.status_code,
+            "retMsg": f"HTTP {response.status_code} {response.reason_phrase}",
+        }
+        retry_after = _retry_after_ms(response) if response.status_code == 429 else None
+        if retry_after is not None:
+            data["retryAfter"] = retry_after
+        return data
+
+
+# Public GETs in flight, keyed by path and params, shared by identical callers
+_inflight: dict[tuple[Any, ...], asyncio.Task[dict[str, Any]]] = {}
+
+
+async def public_get(path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    """GET an unauthenticated endpoint and return the decoded response body.
+
+    Concurrent calls with the same path and params share one request.
+    """
+    key = (path, tuple(sorted(params.items())) if params else ())
+    task = _inflight.get(key)
+    if task is None:
+        client = get_http_client()
+        request = _request(
+            public_limiter, lambda: client.get(path, params=params), idempotent=True
+        )
+        task = asyncio.create_task(request)
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller's cancellation doesn't cancel the others' request
+    return await asyncio.shield(task)
+
+
+async def private_get(path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+    """GET a private endpoint, signing the query string exactly as sent."""
+    signer = require_signer()
+    client = get_http_client()
+
+    def send() -> Awaitable[httpx.Response]:
+        # Build and sign after waiting for admission, and anew on every retry,
+        # so each attempt goes out with a fresh timestamp
+        request = client.build_request("GET", path, params=params)
+        request.headers.update(signer.headers(request.url.query.decode()))
+        return client.send(request)
+
+    return await _request(_private_limiter(path), send, idempotent=True)
+
+
+async def private_post(
+    path: str,
+    body: dict[str, Any],
+    *,
+    idempotent: bool = False,
+    recover: Callable[[], Awaitable[dict[str, Any] | None]] | None = None,
+) -> dict[str, Any]:
+    """POST a JSON body to a private endpoint, signing the bytes as sent.
+
+    Transient failures are retried only when ``idempotent`` is set, i.e. the
+    request is safe to repeat or carries a client-side idempotency key;
+    ``recover`` is passed through to ``with_retry``.
+    """
+    signer = require_signer()
+    client = get_http_client()
+    payload = dumpb(body)
+
+    def send() -> Awaitable[httpx.Response]:
+        headers = {"Content-Type": "application/json", **signer.headers(payload.decode())}
+        return client.post(path, content=payload, headers=headers)
+
+    return await _request(_private_limiter(path), send, idempotent=idempotent, recover=recover)
@@ -1,51 +1,163 @@
 import os
+from dataclasses import dataclass, field
+from pathlib import Path
 
+import httpx
+from aiolimiter import AsyncLimiter
 from dotenv import load_dotenv
-from pybit.unified_trading import HTTP
 
-load_dotenv()
+from bybit_mcp.admission import AdmissionController
+from bybit_mcp.signer import RequestSigner
 
-BYBIT_API_KEY = os.getenv("BYBIT_API_KEY", "")
-BYBIT_API_SECRET = os.getenv("BYBIT_API_SECRET", "")
-BYBIT_TESTNET = os.getenv("BYBIT_TESTNET", "true").lower() == "true"
-PORT = int(os.getenv("PORT", "8080"))
+_ENV = os.environ
+# Project root .env (src/bybit_mcp/config.py -> repo root); loading it by path
+# avoids python-dotenv's upward directory search
+_DOTENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+
+# Parse .env once per process; importlib.reload() keeps the module namespace,
+# so the flag survives reloads from test harnesses. Deployments that inject
+# the environment directly (containers) skip the file lookup entirely.
+if (
+    not globals().get("_DOTENV_LOADED")
+    and _ENV.get("BYBIT_MCP_SKIP_DOTENV") != "1"
+    and _ENV.get("ENV") != "production"
+):
+    if _DOTENV_PATH.is_file():
+        load_dotenv(_DOTENV_PATH, override=False)
+    _DOTENV_LOADED = True
+
+
+def _env(name: str, default: str = "") -> str:
+    """Read an environment variable (called once per setting at import)."""
+    return _ENV.get(name, default)
+
+
+# Values copied from .env.example that mean "not configured"
+_PLACEHOLDERS = frozenset({
+    "",
+    "placeholder",
+    "your_api_key_here",
+    "your_api_secret_here",
+    "your_oauth_secret_here",
+    "your_secure_random_token_here",
+    "your_secure_pin_here",
+    "your_registration_token_here",
+})
+
+
+def _env_any(*names: str, default: str = "") -> str:
+    """Return the first of ``names`` set to a real (non-placeholder) value."""
+    for name in names:
+        value = _ENV.get(name)
+        if value and value not in _PLACEHOLDERS:
+            return value
+    return default
+
+
+_TRUE_VALUES = frozenset({"true", "True", "TRUE", "1", "yes"})
+
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    return _env(name, default) in _TRUE_VALUES
+
+
+BYBIT_API_KEY = _env_any("BYBIT_API_KEY")
+BYBIT_API_SECRET = _env_any("BYBIT_API_SECRET")
+BYBIT_TESTNET = _env_bool("BYBIT_TESTNET", "true")
+PORT = int(_env("PORT", "8080"))
 
 # Auth: OAuth 2.1 + API Key
-OAUTH_SECRET = os.getenv("OAUTH_SECRET", "")
-MCP_API_KEY = os.getenv("MCP_API_KEY", "") or os.getenv("MCP_AUTH_TOKEN", "")
-SERVICE_URL = os.getenv("SERVICE_URL", f"http://localhost:{PORT}")
-CONSENT_PIN = os.getenv("CONSENT_PIN", "") or os.getenv("REGISTRATION_TOKEN", "")
+OAUTH_SECRET = _env_any("OAUTH_SECRET")
+MCP_API_KEY = _env_any("MCP_API_KEY", "MCP_AUTH_TOKEN")
+SERVICE_URL = _env("SERVICE_URL", f"http://localhost:{PORT}")
+CONSENT_PIN = _env_any("CONSENT_PIN", "REGISTRATION_TOKEN")
+# Issue JWT access tokens instead of opaque ones (multi-instance deployments)
+OAUTH_JWT_ACCESS_TOKENS = _env_bool("OAUTH_JWT_ACCESS_TOKENS")
 
 # Backward compat
 MCP_AUTH_TOKEN = MCP_API_KEY
 REGISTRATION_TOKEN = CONSENT_PIN  # alias for old imports
 
-# Treat placeholder values as empty
-if BYBIT_API_KEY in ("", "placeholder", "your_api_key_here"):
-    BYBIT_API_KEY = ""
-if BYBIT_API_SECRET in ("", "placeholder", "your_api_secret_here"):
-    BYBIT_API_SECRET = ""
-if CONSENT_PIN in ("your_secure_pin_here", "your_registration_token_here", "placeholder"):
-    CONSENT_PIN = ""
-
-
-def get_bybit_session(authenticated: bool = True) -> HTTP:
-    """Create a pybit HTTP session."""
-    if authenticated and BYBIT_API_KEY and BYBIT_API_SECRET:
-        return HTTP(
-            testnet=BYBIT_TESTNET,
-            api_key=BYBIT_API_KEY,
-            api_secret=BYBIT_API_SECRET,
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Parsed server settings, resolved once from the environment."""
+
+    bybit_api_key: str = field(repr=False)
+    bybit_api_secret: str = field(repr=False)
+    bybit_testnet: bool
+    port: int
+    oauth_secret: str = field(repr=False)
+    mcp_api_key: str = field(repr=False)
+    service_url: str
+    consent_pin: str = field(repr=False)
+    oauth_jwt_access_tokens: bool
+
+
+settings = Settings(
+    bybit_api_key=BYBIT_API_KEY,
+    bybit_api_secret=BYBIT_API_SECRET,
+    bybit_testnet=BYBIT_TESTNET,
+    port=PORT,
+    oauth_secret=OAUTH_SECRET,
+    mcp_api_key=MCP_API_KEY,
+    service_url=SERVICE_URL,
+    consent_pin=CONSENT_PIN,
+    oauth_jwt_access_tokens=OAUTH_JWT_ACCESS_TOKENS,
+)
+
+
+BYBIT_BASE_URL = "https://api-testnet.bybit.com" if BYBIT_TESTNET else "https://api.bybit.com"
+
+_http_client: httpx.AsyncClient | None = None
+
+# Leaky-bucket request governors (max requests per second), shared by all
+# tools so bursts queue locally instead of tripping Bybit's 10006 limit.
+# Private endpoints draw from their endpoint-class bucket, else the default.
+public_limiter = AsyncLimiter(50, 1)
+private_limiter = AsyncLimiter(10, 1)
+order_limiter = AsyncLimiter(10, 1)
+position_limiter = AsyncLimiter(10, 1)
+
+# Caps concurrent in-flight requests, backing off when Bybit reports pressure
+admission = AdmissionController()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled HTTP/2 client for every Bybit request, created on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=BYBIT_BASE_URL,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=30.0,
+            headers={"Accept": "application/json"},
         )
-    return HTTP(testnet=BYBIT_TESTNET)
+    return _http_client
 
 
-# Shared sessions - lazy init to avoid crash on startup with bad credentials
-public_session = HTTP(testnet=BYBIT_TESTNET)
-private_session: HTTP | None = None
+async def close_http_client() -> None:
+    """Close the shared client; called on server shutdown."""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
 
+
+# Credentials are fixed for the life of the process, so the check is made once
+# here and private calls just invoke require_signer().
 if BYBIT_API_KEY and BYBIT_API_SECRET:
-    try:
-        private_session = get_bybit_session(authenticated=True)
-    except Exception:
-        private_session = None
+    _signer = RequestSigner(BYBIT_API_KEY, BYBIT_API_SECRET)
+
+    def require_signer() -> RequestSigner:
+        """Signer for private endpoints."""
+        return _signer
+
+else:
+
+    def require_signer() -> RequestSigner:
+        """Fail fast: private endpoints need credentials."""
+        raise RuntimeError(
+            "Bybit API credentials not configured. Set BYBIT_API_KEY and BYBIT_API_SECRET."
+        )
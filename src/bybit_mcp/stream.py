@@ -0,0 +1,244 @@
+"""Serve hot ticker polls from Bybit's public WebSocket instead of REST.
+
+Once the same ``(category, symbol)`` ticker is requested ``HOT_HITS`` times
+within ``HOT_WINDOW`` seconds, a subscription on the public stream keeps a
+local copy current and ``get_tickers`` answers from it. Symbols nobody asks
+for during ``IDLE_AFTER`` seconds are unsubscribed again.
+
+Only linear and inverse tickers are streamed: their pushes carry the same
+fields as ``/v5/market/tickers``, while spot pushes lack the top of the book
+and option pushes name their fields differently.
+
+Needs the optional ``websockets`` package (the "ws" extra); without it every
+call stays on REST.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+from bybit_mcp.config import settings
+from bybit_mcp.utils.serialization import dumps, loads
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - exercised only without the "ws" extra
+    websockets = None
+
+logger = logging.getLogger(__name__)
+
+WS_BASE = (
+    "wss://stream-testnet.bybit.com/v5/public"
+    if settings.bybit_testnet
+    else "wss://stream.bybit.com/v5/public"
+)
+
+STREAMED_CATEGORIES = frozenset({"linear", "inverse"})
+HOT_HITS = 3
+HOT_WINDOW = 10.0
+# A cached row older than this means the stream is down; fall back to REST
+STALE_AFTER = 5.0
+IDLE_AFTER = 60.0
+# Bybit drops connections without a ping every 20 seconds
+PING_INTERVAL = 20.0
+MAX_BACKOFF = 30.0
+# Keep each subscribe request within Bybit's 10-topic limit
+_ARGS_PER_OP = 10
+# A linear/inverse /v5/market/tickers row; streamed rows are reported with
+# exactly these fields ("" where the push has none, as REST does)
+TICKER_FIELDS = (
+    "symbol",
+    "lastPrice",
+    "indexPrice",
+    "markPrice",
+    "prevPrice24h",
+    "price24hPcnt",
+    "highPrice24h",
+    "lowPrice24h",
+    "prevPrice1h",
+    "openInterest",
+    "openInterestValue",
+    "turnover24h",
+    "volume24h",
+    "fundingRate",
+    "nextFundingTime",
+    "predictedDeliveryPrice",
+    "basisRate",
+    "deliveryFeeRate",
+    "deliveryTime",
+    "ask1Size",
+    "bid1Price",
+    "ask1Price",
+    "bid1Size",
+    "basis",
+    "preOpenPrice",
+    "preQty",
+    "curPreListingPhase",
+)
+
+
+class TickerStream:
+    """Ticker cache fed by one public WebSocket connection per category."""
+
+    def __init__(self) -> None:
+        # Recent lookups of symbols not (yet) subscribed; swept once per window
+        self._hits: dict[tuple[str, str], deque[float]] = {}
+        self._next_sweep = 0.0
+        # Last lookup of each subscribed symbol, for idle unsubscription
+        self._last_used: dict[tuple[str, str], float] = {}
+        # (category, symbol) -> (monotonic receive time, ticker row)
+        self._rows: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
+        self._topics: dict[str, set[str]] = defaultdict(set)
+        self._sockets: dict[str, Any] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        # Subscribe requests in flight; referenced so they aren't collected mid-send
+        self._sends: set[asyncio.Task[None]] = set()
+
+    def lookup(self, category: str, symbol: str) -> dict[str, Any] | None:
+        """Streamed ticker result for ``symbol``, or None to use REST."""
+        if websockets is None or category not in STREAMED_CATEGORIES:
+            return None
+        key = (category, symbol)
+        now = time.monotonic()
+        if symbol in self._topics[category]:
+            self._last_used[key] = now
+            cached = self._rows.get(key)
+            if cached is not None and now - cached[0] < STALE_AFTER:
+                row = {field: cached[1].get(field, "") for field in TICKER_FIELDS}
+                return {"category": category, "list": [row]}
+            return None
+        if now >= self._next_sweep:
+            self._sweep_hits(now - HOT_WINDOW)
+            self._next_sweep = now + HOT_WINDOW
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        hits.append(now)
+        while hits[0] <= now - HOT_WINDOW:
+            hits.popleft()
+        if len(hits) >= HOT_HITS:
+            del self._hits[key]
+            self._last_used[key] = now
+            self._subscribe(category, symbol)
+        return None
+
+    async def close(self) -> None:
+        """Cancel every stream connection."""
+        tasks = [*self._tasks.values(), *self._sends]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._sends.clear()
+        self._sockets.clear()
+        self._topics.clear()
+        self._rows.clear()
+        self._last_used.clear()
+        self._hits.clear()
+
+    def _sweep_hits(self, cutoff: float) -> None:
+        """Forget symbols with no lookup inside the current window."""
+        stale = [key for key, hits in self._hits.items() if hits[-1] <= cutoff]
+        for key in stale:
+            del self._hits[key]
+
+    def _subscribe(self, category: str, symbol: str) -> None:
+        self._topics[category].add(symbol)
+        socket = self._sockets.get(category)
+        if socket is not None:
+            task = asyncio.create_task(self._send(socket, "subscribe", [symbol]))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+        if category not in self._tasks:
+            self._tasks[category] = asyncio.create_task(self._run(category))
+
+    def _unsubscribe_idle(self, category: str) -> list[str]:
+        """Drop symbols nobody has looked up for ``IDLE_AFTER`` seconds."""
+        now = time.monotonic()
+        topics = self._topics[category]
+        idle = [
+            symbol
+            for symbol in topics
+            if now - self._last_used.get((category, symbol), 0.0) > IDLE_AFTER
+        ]
+        topics.difference_update(idle)
+        for symbol in idle:
+            self._rows.pop((category, symbol), None)
+            self._last_used.pop((category, symbol), None)
+        return idle
+
+    async def _run(self, category: str) -> None:
+        topics = self._topics[category]
+        backoff = 1.0
+        try:
+            while topics:
+                try:
+                    url = f"{WS_BASE}/{category}"
+                    async with websockets.connect(url, ping_interval=None) as socket:
+                        self._sockets[category] = socket
+                        await self._send(socket, "subscribe", sorted(topics))
+                        backoff = 1.0
+                        keepalive = asyncio.create_task(self._keepalive(category, socket))
+                        try:
+                            async for message in socket:
+                                self._apply(category, loads(message))
+                        finally:
+                            keepalive.cancel()
+                except Exception:
+                    logger.warning("%s ticker stream failed", category, exc_info=True)
+                finally:
+                    self._sockets.pop(category, None)
+                # Keepalive can't unsubscribe while disconnected, so an
+                # unreachable stream stops once its symbols go idle
+                self._unsubscribe_idle(category)
+                if topics:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+        finally:
+            self._tasks.pop(category, None)
+            self._sockets.pop(category, None)
+            # However the loop ended, forget its symbols so lookup can subscribe again
+            for symbol in topics:
+                self._rows.pop((category, symbol), None)
+                self._last_used.pop((category, symbol), None)
+            topics.clear()
+
+    async def _keepalive(self, category: str, socket: Any) -> None:
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            idle = self._unsubscribe_idle(category)
+            if idle:
+                if not self._topics[category]:
+                    await socket.close()
+                    return
+                await self._send(socket, "unsubscribe", idle)
+            await socket.send(dumps({"op": "ping"}))
+
+    @staticmethod
+    async def _send(socket: Any, op: str, symbols: list[str]) -> None:
+        # A dropped connection resubscribes every topic when it reconnects
+        with contextlib.suppress(websockets.WebSocketException):
+            for i in range(0, len(symbols), _ARGS_PER_OP):
+                args = [f"tickers.{symbol}" for symbol in symbols[i : i + _ARGS_PER_OP]]
+                await socket.send(dumps({"op": op, "args": args}))
+
+    def _apply(self, category: str, message: dict[str, Any]) -> None:
+        topic = message.get("topic", "")
+        if not topic.startswith("tickers."):
+            return  # subscribe acks and pongs
+        data = message.get("data") or {}
+        key = (category, data.get("symbol") or topic.removeprefix("tickers."))
+        cached = self._rows.get(key)
+        if message.get("type") == "delta" and cached is not None:
+            # Linear/inverse pushes carry only the fields that changed
+            row = cached[1]
+            row.update(data)
+        else:
+            row = dict(data)
+        self._rows[key] = (time.monotonic(), row)
+
+
+ticker_stream = TickerStream()
@@ -1,55 +1,47 @@
 from typing import Any
 
-from bybit_mcp.config import private_session
+from bybit_mcp.client import private_get
+from bybit_mcp.utils.cache import ttl_cache
 from bybit_mcp.utils.formatters import format_response
+from bybit_mcp.utils.params import build_params
 
 
-def _require_auth() -> None:
-    if private_session is None:
-        raise RuntimeError("Bybit API credentials not configured. Set BYBIT_API_KEY and BYBIT_API_SECRET.")
-
-
-def get_wallet_balance(
+async def get_wallet_balance(
     account_type: str = "UNIFIED",
     coin: str | None = None,
 ) -> dict[str, Any]:
-    """Get wallet balance for the unified account.
+    """Get wallet balance showing equity, available balance, unrealized PnL per coin.
 
     Args:
-        account_type: Account type - UNIFIED (default) or CONTRACT
-        coin: Specific coin e.g. USDT, BTC (optional, comma-separated for multiple)
+        account_type: UNIFIED (default) or CONTRACT
+        coin: Specific coin e.g. USDT, BTC (comma-separated for multiple)
     """
-    _require_auth()
-    params: dict[str, Any] = {"accountType": account_type}
-    if coin:
-        params["coin"] = coin
-    return format_response(private_session.get_wallet_balance(**params))
+    params = build_params(accountType=account_type, coin=coin)
+    return format_response(await private_get("/v5/account/wallet-balance", params))
 
 
-def get_fee_rate(
+async def get_fee_rate(
     category: str,
     symbol: str | None = None,
 ) -> dict[str, Any]:
-    """Get trading fee rates.
+    """Get current trading fee rates.
 
     Args:
         category: Product type - spot, linear, inverse, option
-        symbol: Trading pair filter (optional)
+        symbol: Trading pair filter
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category}
-    if symbol:
-        params["symbol"] = symbol
-    return format_response(private_session.get_fee_rates(**params))
+    params = build_params(category=category, symbol=symbol)
+    return format_response(await private_get("/v5/account/fee-rate", params))
 
 
-def get_account_info() -> dict[str, Any]:
-    """Get account information (margin mode, account type, SMP group, etc.)."""
-    _require_auth()
-    return format_response(private_session.get_account_info())
+# Rarely changes; a short TTL absorbs bursts of identical calls
+@ttl_cache(0.5)
+async def get_account_info() -> dict[str, Any]:
+    """Get account information including margin mode, account type, and SMP group."""
+    return format_response(await private_get("/v5/account/info"))
 
 
-def get_transaction_log(
+async def get_transaction_log(
     category: str | None = None,
     coin: str | None = None,
     type: str | None = None,
@@ -57,26 +49,22 @@ def get_transaction_log(
     start_time: int | None = None,
     end_time: int | None = None,
 ) -> dict[str, Any]:
-    """Get transaction log (trades, funding, transfers, etc.).
+    """Get transaction log (trades, funding fees, transfers, settlements).
 
     Args:
         category: Product type filter - spot, linear, inverse, option
         coin: Coin filter e.g. USDT
-        type: Transaction type - TRANSFER_IN, TRANSFER_OUT, TRADE, FEE, etc.
-        limit: Results per page 1-50 (default: 20)
+        type: Transaction type - TRANSFER_IN, TRANSFER_OUT, TRADE, FEE, FUNDING_FEE, etc.
+        limit: Results 1-50 (default: 20)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    _require_auth()
-    params: dict[str, Any] = {"limit": limit}
-    if category:
-        params["category"] = category
-    if coin:
-        params["coin"] = coin
-    if type:
-        params["type"] = type
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(private_session.get_transaction_log(**params))
+    params = build_params(
+        limit=limit,
+        category=category,
+        coin=coin,
+        type=type,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await private_get("/v5/account/transaction-log", params))
@@ -1,21 +1,18 @@
+import uuid
 from typing import Any
 
-from bybit_mcp.config import private_session
+from bybit_mcp.client import private_get, private_post
 from bybit_mcp.utils.formatters import format_response
+from bybit_mcp.utils.params import build_params
 
 
-def _require_auth() -> None:
-    if private_session is None:
-        raise RuntimeError("Bybit API credentials not configured. Set BYBIT_API_KEY and BYBIT_API_SECRET.")
-
-
-def get_coin_balance(
+async def get_coin_balance(
     account_type: str = "UNIFIED",
     coin: str | None = None,
     member_id: str | None = None,
     with_bonus: int | None = None,
 ) -> dict[str, Any]:
-    """Get balance for a specific coin across account types.
+    """Get coin balance across different account types.
 
     Args:
         account_type: UNIFIED, CONTRACT, SPOT, INVESTMENT, OPTION, FUND
@@ -23,47 +20,50 @@ def get_coin_balance(
         member_id: Sub-account member ID (master account only)
         with_bonus: 0=exclude bonus, 1=include bonus
     """
-    _require_auth()
-    params: dict[str, Any] = {"accountType": account_type}
-    if coin:
-        params["coin"] = coin
-    if member_id:
-        params["memberId"] = member_id
-    if with_bonus is not None:
-        params["withBonus"] = with_bonus
-    return format_response(private_session.get_coins_balance(**params))
+    params = build_params(
+        accountType=account_type,
+        coin=coin,
+        memberId=member_id,
+        withBonus=with_bonus,
+    )
+    return format_response(await private_get("/v5/asset/transfer/query-account-coins-balance", params))
 
 
-def internal_transfer(
+async def internal_transfer(
     coin: str,
     amount: str,
     from_account_type: str,
     to_account_type: str,
     transfer_id: str | None = None,
 ) -> dict[str, Any]:
-    """Transfer funds between your own account types (e.g. UNIFIED to FUND).
+    """Transfer funds between your own accounts (e.g. UNIFIED to FUND).
 
     Args:
         coin: Coin to transfer e.g. USDT
-        amount: Amount to transfer as string
-        from_account_type: Source account - UNIFIED, CONTRACT, SPOT, FUND, etc.
-        to_account_type: Destination account - UNIFIED, CONTRACT, SPOT, FUND, etc.
-        transfer_id: Custom UUID for the transfer (auto-generated if omitted)
+        amount: Amount as string e.g. "100"
+        from_account_type: Source - UNIFIED, CONTRACT, SPOT, FUND
+        to_account_type: Destination - UNIFIED, CONTRACT, SPOT, FUND
+        transfer_id: Custom UUID (auto-generated if omitted)
     """
-    _require_auth()
-    import uuid
-
     params: dict[str, Any] = {
+        # Bybit validates transferId as a UUID, so a bare hex token won't do
         "transferId": transfer_id or str(uuid.uuid4()),
         "coin": coin,
         "amount": amount,
         "fromAccountType": from_account_type,
         "toAccountType": to_account_type,
     }
-    return format_response(private_session.create_internal_transfer(**params))
+    # transferId makes the request idempotent, so transient failures are retried
+    result = format_response(
+        await private_post("/v5/asset/transfer/inter-transfer", params, idempotent=True)
+    )
+    if result.get("error"):
+        # Hand back the id so a manual retry reuses it instead of transferring twice
+        result["transferId"] = params["transferId"]
+    return result
 
 
-def get_deposit_records(
+async def get_deposit_records(
     coin: str | None = None,
     limit: int = 50,
     start_time: int | None = None,
@@ -72,23 +72,21 @@ def get_deposit_records(
     """Get deposit history records.
 
     Args:
-        coin: Coin filter e.g. USDT (optional)
-        limit: Results per page 1-50 (default: 50)
+        coin: Coin filter e.g. USDT
+        limit: Results 1-50 (default: 50)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    _require_auth()
-    params: dict[str, Any] = {"limit": limit}
-    if coin:
-        params["coin"] = coin
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(private_session.get_deposit_records(**params))
+    params = build_params(
+        limit=limit,
+        coin=coin,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await private_get("/v5/asset/deposit/query-record", params))
 
 
-def get_withdrawal_records(
+async def get_withdrawal_records(
     coin: str | None = None,
     limit: int = 50,
     start_time: int | None = None,
@@ -97,17 +95,15 @@ def get_withdrawal_records(
     """Get withdrawal history records.
 
     Args:
-        coin: Coin filter e.g. USDT (optional)
-        limit: Results per page 1-50 (default: 50)
+        coin: Coin filter e.g. USDT
+        limit: Results 1-50 (default: 50)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    _require_auth()
-    params: dict[str, Any] = {"limit": limit}
-    if coin:
-        params["coin"] = coin
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(private_session.get_withdraw_records(**params))
+    params = build_params(
+        limit=limit,
+        coin=coin,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await private_get("/v5/asset/withdraw/query-record", params))
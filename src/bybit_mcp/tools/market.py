@@ -1,23 +1,96 @@
+import time
 from typing import Any
 
-from bybit_mcp.config import public_session
+from bybit_mcp.client import public_get
+from bybit_mcp.stream import ticker_stream
+from bybit_mcp.utils.cache import ttl_cache
 from bybit_mcp.utils.formatters import format_response
+from bybit_mcp.utils.params import build_params
 
+# Historical windows never change; these entries live until evicted
+_HISTORICAL_TTL = 86400.0
 
-def get_tickers(category: str, symbol: str | None = None) -> dict[str, Any]:
-    """Get real-time ticker data (price, volume, funding rate, 24h change).
+_INTERVAL_MS = {"D": 86_400_000, "W": 604_800_000, "M": 2_678_400_000}
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _interval_ms(interval: str) -> int:
+    if interval.isdigit():
+        return int(interval) * 60_000
+    return _INTERVAL_MS.get(interval, 0)
+
+
+def _kline_ttl(
+    symbol: str,
+    interval: str,
+    category: str = "linear",
+    limit: int = 200,
+    start: int | None = None,
+    end: int | None = None,
+) -> float:
+    """Candles ending two intervals ago are final; newer windows are not cached."""
+    step = _interval_ms(interval)
+    if end and step and end < _now_ms() - 2 * step:
+        return _HISTORICAL_TTL
+    return 0
+
+
+def _funding_ttl(
+    symbol: str,
+    category: str = "linear",
+    limit: int = 200,
+    start_time: int | None = None,
+    end_time: int | None = None,
+) -> float:
+    """Funding settled before now is final; open-ended windows refresh each minute."""
+    if end_time and end_time < _now_ms():
+        return _HISTORICAL_TTL
+    return 60
+
+
+async def get_tickers(category: str, symbol: str | None = None) -> dict[str, Any]:
+    """Get real-time ticker data including price, volume, 24h change, and funding rate.
 
     Args:
         category: Product type - spot, linear, inverse, or option
-        symbol: Trading pair e.g. BTCUSDT (required for option, optional otherwise)
+        symbol: Trading pair e.g. BTCUSDT (required for option)
+    """
+    # Linear/inverse symbols polled in a tight loop are answered from the
+    # WebSocket stream, in the same shape as the REST result
+    if symbol and (streamed := ticker_stream.lookup(category, symbol)) is not None:
+        return streamed
+    params = build_params(category=category, symbol=symbol)
+    return format_response(await public_get("/v5/market/tickers", params))
+
+
+# One full-category snapshot serves every batch call within half a second
+@ttl_cache(0.5)
+async def _ticker_snapshot(category: str) -> dict[str, Any]:
+    return format_response(await public_get("/v5/market/tickers", {"category": category}))
+
+
+async def get_tickers_batch(category: str, symbols: list[str]) -> dict[str, Any]:
+    """Get ticker data for several symbols at once (cheaper than one get_tickers call per symbol).
+
+    Args:
+        category: Product type - spot, linear, or inverse
+        symbols: Trading pairs e.g. ["BTCUSDT", "ETHUSDT"]
     """
-    params: dict[str, Any] = {"category": category}
-    if symbol:
-        params["symbol"] = symbol
-    return format_response(public_session.get_tickers(**params))
+    snapshot = await _ticker_snapshot(category)
+    if snapshot.get("error"):
+        return snapshot
+    wanted = set(symbols)
+    return {
+        "category": snapshot.get("category", category),
+        "list": [row for row in snapshot.get("list", []) if row.get("symbol") in wanted],
+    }
 
 
-def get_klines(
+@ttl_cache(_kline_ttl)
+async def get_klines(
     symbol: str,
     interval: str,
     category: str = "linear",
@@ -25,35 +98,33 @@ def get_klines(
     start: int | None = None,
     end: int | None = None,
 ) -> dict[str, Any]:
-    """Get candlestick/kline historical data.
+    """Get candlestick/kline historical data for technical analysis.
 
     Args:
         symbol: Trading pair e.g. BTCUSDT
-        interval: Candle interval - 1,3,5,15,30,60,120,240,360,720,D,W,M
+        interval: Candle interval - 1,3,5,15,30,60,120,240,360,720,D,W,M (minutes or D/W/M)
         category: Product type - spot, linear, inverse (default: linear)
-        limit: Results per page 1-1000 (default: 200)
+        limit: Number of candles 1-1000 (default: 200)
         start: Start timestamp in milliseconds
         end: End timestamp in milliseconds
     """
-    params: dict[str, Any] = {
-        "category": category,
-        "symbol": symbol,
-        "interval": interval,
-        "limit": limit,
-    }
-    if start:
-        params["start"] = start
-    if end:
-        params["end"] = end
-    return format_response(public_session.get_kline(**params))
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        interval=interval,
+        limit=limit,
+        start=start or None,
+        end=end or None,
+    )
+    return format_response(await public_get("/v5/market/kline", params))
 
 
-def get_orderbook(
+async def get_orderbook(
     symbol: str,
     category: str = "linear",
     limit: int = 25,
 ) -> dict[str, Any]:
-    """Get order book depth data (bids and asks).
+    """Get order book depth data showing bids and asks.
 
     Args:
         symbol: Trading pair e.g. BTCUSDT
@@ -61,16 +132,23 @@ def get_orderbook(
         limit: Depth limit - spot:1-200, linear/inverse:1-500, option:1-25
     """
     return format_response(
-        public_session.get_orderbook(category=category, symbol=symbol, limit=limit)
+        await public_get(
+            "/v5/market/orderbook",
+            {
+                "category": category,
+                "symbol": symbol,
+                "limit": limit,
+            },
+        )
     )
 
 
-def get_recent_trades(
+async def get_recent_trades(
     symbol: str,
     category: str = "linear",
     limit: int = 60,
 ) -> dict[str, Any]:
-    """Get recent public trades for a symbol.
+    """Get recent public trades executed on the exchange.
 
     Args:
         symbol: Trading pair e.g. BTCUSDT
@@ -78,63 +156,71 @@ def get_recent_trades(
         limit: Number of trades 1-1000 (default: 60)
     """
     return format_response(
-        public_session.get_public_trade_history(
-            category=category, symbol=symbol, limit=limit
+        await public_get(
+            "/v5/market/recent-trade",
+            {
+                "category": category,
+                "symbol": symbol,
+                "limit": limit,
+            },
         )
     )
 
 
-def get_instruments(
+# Tick and lot sizes change rarely and the full listing is large
+@ttl_cache(300)
+async def get_instruments(
     category: str,
     symbol: str | None = None,
     status: str | None = None,
     limit: int = 500,
 ) -> dict[str, Any]:
-    """Get instrument specifications (tick size, lot size, leverage, trading rules).
+    """Get instrument specifications including tick size, lot size, leverage limits, and trading rules.
 
     Args:
         category: Product type - spot, linear, inverse, option
-        symbol: Trading pair e.g. BTCUSDT (optional, returns all if omitted)
-        status: Filter by status - Trading, Settling, Delivering, Closed
+        symbol: Trading pair e.g. BTCUSDT (optional)
+        status: Filter - Trading, Settling, Delivering, Closed
         limit: Results per page (default: 500)
     """
-    params: dict[str, Any] = {"category": category, "limit": limit}
-    if symbol:
-        params["symbol"] = symbol
-    if status:
-        params["status"] = status
-    return format_response(public_session.get_instruments_info(**params))
+    params = build_params(
+        category=category,
+        limit=limit,
+        symbol=symbol,
+        status=status,
+    )
+    return format_response(await public_get("/v5/market/instruments-info", params))
 
 
-def get_funding_rate_history(
+@ttl_cache(_funding_ttl)
+async def get_funding_rate_history(
     symbol: str,
     category: str = "linear",
     limit: int = 200,
     start_time: int | None = None,
     end_time: int | None = None,
 ) -> dict[str, Any]:
-    """Get historical funding rate data.
+    """Get historical funding rate data for perpetual contracts.
 
     Args:
         symbol: Trading pair e.g. BTCUSDT
         category: Product type - linear or inverse
-        limit: Results per page 1-200 (default: 200)
+        limit: Results 1-200 (default: 200)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    params: dict[str, Any] = {
-        "category": category,
-        "symbol": symbol,
-        "limit": limit,
-    }
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(public_session.get_funding_rate_history(**params))
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        limit=limit,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await public_get("/v5/market/funding/history", params))
 
 
-def get_mark_price_kline(
+@ttl_cache(_kline_ttl)
+async def get_mark_price_kline(
     symbol: str,
     interval: str,
     category: str = "linear",
@@ -148,24 +234,22 @@ def get_mark_price_kline(
         symbol: Trading pair e.g. BTCUSDT
         interval: Candle interval - 1,3,5,15,30,60,120,240,360,720,D,W,M
         category: Product type - linear or inverse
-        limit: Results per page 1-1000 (default: 200)
+        limit: Results 1-1000 (default: 200)
         start: Start timestamp in milliseconds
         end: End timestamp in milliseconds
     """
-    params: dict[str, Any] = {
-        "category": category,
-        "symbol": symbol,
-        "interval": interval,
-        "limit": limit,
-    }
-    if start:
-        params["start"] = start
-    if end:
-        params["end"] = end
-    return format_response(public_session.get_mark_price_kline(**params))
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        interval=interval,
+        limit=limit,
+        start=start or None,
+        end=end or None,
+    )
+    return format_response(await public_get("/v5/market/mark-price-kline", params))
 
 
-def get_open_interest(
+async def get_open_interest(
     symbol: str,
     interval_time: str,
     category: str = "linear",
@@ -179,23 +263,23 @@ def get_open_interest(
         symbol: Trading pair e.g. BTCUSDT
         interval_time: Interval - 5min, 15min, 30min, 1h, 4h, 1d
         category: Product type - linear or inverse
-        limit: Results per page 1-200 (default: 200)
+        limit: Results 1-200 (default: 200)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    params: dict[str, Any] = {
-        "category": category,
-        "symbol": symbol,
-        "intervalTime": interval_time,
-        "limit": limit,
-    }
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(public_session.get_open_interest(**params))
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        intervalTime=interval_time,
+        limit=limit,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await public_get("/v5/market/open-interest", params))
 
 
-def get_server_time() -> dict[str, Any]:
-    """Get Bybit server time. Useful for checking connectivity and clock sync."""
-    return format_response(public_session.get_server_time())
+# Polled by clients for connectivity checks; a short TTL absorbs bursts
+@ttl_cache(1)
+async def get_server_time() -> dict[str, Any]:
+    """Get Bybit server time. Useful for checking connectivity and time sync."""
+    return format_response(await public_get("/v5/market/time"))
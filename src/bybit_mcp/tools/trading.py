@@ -1,15 +1,51 @@
+import asyncio
+import functools
+import secrets
+from decimal import Decimal, InvalidOperation
 from typing import Any
 
-from bybit_mcp.config import private_session
+from bybit_mcp.client import private_get, private_post
 from bybit_mcp.utils.formatters import format_response
+from bybit_mcp.utils.params import build_params
+from bybit_mcp.utils.validation import order_error
 
+# Orders per batch request; Bybit allows 20 except for spot
+_BATCH_LIMITS = {"spot": 10}
+# Final states of an order whose cancel went through
+_CANCELLED = frozenset({"Cancelled", "PartiallyFilledCanceled", "Deactivated"})
 
-def _require_auth() -> None:
-    if private_session is None:
-        raise RuntimeError("Bybit API credentials not configured. Set BYBIT_API_KEY and BYBIT_API_SECRET.")
 
+async def _find_order(lookup: dict[str, Any]) -> dict[str, Any] | None:
+    """The order matching ``lookup``, open or already closed, or None."""
+    # Realtime lists only open orders by default; a Market or IOC order may
+    # have filled or cancelled by the time we look, leaving it in history
+    for path in ("/v5/order/realtime", "/v5/order/history"):
+        found = await private_get(path, lookup)
+        orders = found.get("result", {}).get("list") if found.get("retCode") == 0 else None
+        if orders:
+            return orders[0]
+    return None
 
-def place_order(
+
+@functools.lru_cache(maxsize=32)
+def _order_template(
+    category: str,
+    symbol: str,
+    order_type: str,
+    time_in_force: str | None,
+    position_idx: int,
+) -> dict[str, Any]:
+    """Order fields a bot rarely varies within one market; copy before filling in."""
+    return build_params(
+        category=category,
+        symbol=symbol,
+        orderType=order_type,
+        timeInForce=time_in_force,
+        positionIdx=position_idx,
+    )
+
+
+async def place_order(
     category: str,
     symbol: str,
     side: str,
@@ -30,74 +66,91 @@ def place_order(
     sl_limit_price: str | None = None,
     is_leverage: int | None = None,
 ) -> dict[str, Any]:
-    """Place a new order (market, limit, or conditional).
+    """Place a new order on Bybit (market, limit, or conditional with optional TP/SL).
 
     Args:
         category: Product type - spot, linear, inverse, option
         symbol: Trading pair e.g. BTCUSDT
         side: Buy or Sell
         order_type: Market or Limit
-        qty: Order quantity as string
+        qty: Order quantity as string e.g. "0.001"
         price: Limit price (required for Limit orders)
         time_in_force: GTC, IOC, FOK, or PostOnly
         trigger_price: Trigger price for conditional orders
         trigger_direction: 1=price rises to trigger, 2=price falls to trigger
         take_profit: Take profit price
         stop_loss: Stop loss price
-        reduce_only: If true, only reduces position
+        reduce_only: If true, only reduces existing position
         position_idx: 0=one-way, 1=hedge-buy, 2=hedge-sell
-        order_link_id: Custom order ID (max 36 chars, must be unique)
-        tp_order_type: TP order type - Market or Limit
-        sl_order_type: SL order type - Market or Limit
+        order_link_id: Custom order ID (max 36 chars, unique; generated if omitted)
+        tp_order_type: TP execution type - Market or Limit
+        sl_order_type: SL execution type - Market or Limit
         tp_limit_price: Limit price for TP (when tp_order_type=Limit)
         sl_limit_price: Limit price for SL (when sl_order_type=Limit)
-        is_leverage: 0=spot, 1=margin trading (spot category only)
+        is_leverage: 0=spot, 1=margin trading (spot only)
     """
-    _require_auth()
-    params: dict[str, Any] = {
-        "category": category,
-        "symbol": symbol,
-        "side": side,
-        "orderType": order_type,
-        "qty": qty,
-        "positionIdx": position_idx,
-    }
-    if price:
-        params["price"] = price
-    if time_in_force:
-        params["timeInForce"] = time_in_force
-    if trigger_price:
-        params["triggerPrice"] = trigger_price
-    if trigger_direction:
-        params["triggerDirection"] = trigger_direction
-    if take_profit:
-        params["takeProfit"] = take_profit
-    if stop_loss:
-        params["stopLoss"] = stop_loss
-    if reduce_only:
-        params["reduceOnly"] = reduce_only
-    if order_link_id:
-        params["orderLinkId"] = order_link_id
-    if tp_order_type:
-        params["tpOrderType"] = tp_order_type
-    if sl_order_type:
-        params["slOrderType"] = sl_order_type
-    if tp_limit_price:
-        params["tpLimitPrice"] = tp_limit_price
-    if sl_limit_price:
-        params["slLimitPrice"] = sl_limit_price
-    if is_leverage is not None:
-        params["isLeverage"] = is_leverage
-    return format_response(private_session.place_order(**params))
-
-
-def cancel_order(
+    error = order_error(
+        category,
+        side=side,
+        order_link_id=order_link_id,
+        positive=(("qty", qty),),
+        decimals=(
+            ("price", price),
+            ("trigger_price", trigger_price),
+            ("take_profit", take_profit),
+            ("stop_loss", stop_loss),
+            ("tp_limit_price", tp_limit_price),
+            ("sl_limit_price", sl_limit_price),
+        ),
+    )
+    if error:
+        return error
+    # Every order gets an idempotency key so a lost response can be retried safely
+    order_link_id = order_link_id or f"mcp-{secrets.token_urlsafe(12)}"
+    params = _order_template(category, symbol, order_type, time_in_force, position_idx).copy()
+    params |= build_params(
+        side=side,
+        qty=qty,
+        price=price,
+        triggerPrice=trigger_price,
+        triggerDirection=trigger_direction or None,
+        takeProfit=take_profit,
+        stopLoss=stop_loss,
+        reduceOnly=reduce_only,
+        orderLinkId=order_link_id,
+        tpOrderType=tp_order_type,
+        slOrderType=sl_order_type,
+        tpLimitPrice=tp_limit_price,
+        slLimitPrice=sl_limit_price,
+        isLeverage=is_leverage,
+    )
+
+    async def placed_order() -> dict[str, Any] | None:
+        # An attempt whose response was lost may still have created the order
+        order = await _find_order(
+            {"category": category, "symbol": symbol, "orderLinkId": order_link_id}
+        )
+        if order is None:
+            return None
+        ids = {"orderId": order["orderId"], "orderLinkId": order_link_id}
+        return {"retCode": 0, "result": ids}
+
+    result = format_response(
+        await private_post("/v5/order/create", params, idempotent=True, recover=placed_order)
+    )
+    if result.get("error"):
+        # Hand back the key so a manual retry can't place the order twice
+        result["orderLinkId"] = order_link_id
+    return result
+
+
+async def cancel_order(
     category: str,
     symbol: str,
     order_id: str | None = None,
     order_link_id: str | None = None,
 ) -> dict[str, Any]:
-    """Cancel an active order.
+    """Cancel an active order by order ID or custom order link ID.
 
     Args:
         category: Product type - spot, linear, inverse, option
@@ -105,33 +158,44 @@ def cancel_order(
         order_id: Bybit order ID (provide this or order_link_id)
         order_link_id: Custom order ID (provide this or order_id)
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category, "symbol": symbol}
-    if order_id:
-        params["orderId"] = order_id
-    if order_link_id:
-        params["orderLinkId"] = order_link_id
-    return format_response(private_session.cancel_order(**params))
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        orderId=order_id,
+        orderLinkId=order_link_id,
+    )
+
+    async def cancelled_order() -> dict[str, Any] | None:
+        # Resending a cancel that already went through comes back as "order
+        # not exists", so first check whether the order is cancelled
+        order = await _find_order(params)
+        if order is None or order.get("orderStatus") not in _CANCELLED:
+            return None
+        ids = {"orderId": order.get("orderId", ""), "orderLinkId": order.get("orderLinkId", "")}
+        return {"retCode": 0, "result": ids}
+
+    return format_response(
+        await private_post("/v5/order/cancel", params, idempotent=True, recover=cancelled_order)
+    )
 
 
-def cancel_all_orders(
+async def cancel_all_orders(
     category: str,
     symbol: str | None = None,
 ) -> dict[str, Any]:
-    """Cancel all active orders for a category (optionally filtered by symbol).
+    """Cancel all active orders for a category, optionally filtered by symbol.
 
     Args:
         category: Product type - spot, linear, inverse, option
-        symbol: Trading pair to cancel orders for (optional, cancels all if omitted)
+        symbol: Trading pair to cancel orders for (cancels all if omitted)
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category}
-    if symbol:
-        params["symbol"] = symbol
-    return format_response(private_session.cancel_all_orders(**params))
+    params = build_params(category=category, symbol=symbol)
+    return format_response(
+        await private_post("/v5/order/cancel-all", params, idempotent=True)
+    )
 
 
-def amend_order(
+async def amend_order(
     category: str,
     symbol: str,
     order_id: str | None = None,
@@ -142,7 +206,7 @@ def amend_order(
     take_profit: str | None = None,
     stop_loss: str | None = None,
 ) -> dict[str, Any]:
-    """Modify an existing active order (change price, qty, TP/SL).
+    """Modify an existing order (change price, quantity, trigger, TP/SL).
 
     Args:
         category: Product type - spot, linear, inverse, option
@@ -155,26 +219,59 @@ def amend_order(
         take_profit: New take profit price
         stop_loss: New stop loss price
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category, "symbol": symbol}
-    if order_id:
-        params["orderId"] = order_id
-    if order_link_id:
-        params["orderLinkId"] = order_link_id
-    if qty:
-        params["qty"] = qty
-    if price:
-        params["price"] = price
-    if trigger_price:
-        params["triggerPrice"] = trigger_price
-    if take_profit:
-        params["takeProfit"] = take_profit
-    if stop_loss:
-        params["stopLoss"] = stop_loss
-    return format_response(private_session.amend_order(**params))
-
-
-def get_open_orders(
+    error = order_error(
+        category,
+        order_link_id=order_link_id,
+        decimals=(
+            ("qty", qty),
+            ("price", price),
+            ("trigger_price", trigger_price),
+            ("take_profit", take_profit),
+            ("stop_loss", stop_loss),
+        ),
+    )
+    if error:
+        return error
+    params = build_params(
+        category=category,
+        symbol=symbol,
+        orderId=order_id,
+        orderLinkId=order_link_id,
+        qty=qty,
+        price=price,
+        triggerPrice=trigger_price,
+        takeProfit=take_profit,
+        stopLoss=stop_loss,
+    )
+    lookup = build_params(
+        category=category, symbol=symbol, orderId=order_id, orderLinkId=order_link_id
+    )
+    wanted = {
+        field: Decimal(value)
+        for field, value in params.items()
+        if field in ("qty", "price", "triggerPrice", "takeProfit", "stopLoss")
+    }
+
+    async def amended_order() -> dict[str, Any] | None:
+        # Resending an amend that already went through comes back as "order
+        # not modified", so first check whether the order carries the new values
+        order = await _find_order(lookup)
+        if order is None:
+            return None
+        try:
+            if any(Decimal(order.get(field) or "0") != value for field, value in wanted.items()):
+                return None
+        except InvalidOperation:
+            return None
+        ids = {"orderId": order.get("orderId", ""), "orderLinkId": order.get("orderLinkId", "")}
+        return {"retCode": 0, "result": ids}
+
+    return format_response(
+        await private_post("/v5/order/amend", params, idempotent=True, recover=amended_order)
+    )
+
+
+async def get_open_orders(
     category: str,
     symbol: str | None = None,
     order_id: str | None = None,
@@ -185,23 +282,22 @@ def get_open_orders(
 
     Args:
         category: Product type - spot, linear, inverse, option
-        symbol: Trading pair filter (optional)
+        symbol: Trading pair filter
         order_id: Filter by specific order ID
         order_link_id: Filter by custom order ID
         limit: Results per page 1-50 (default: 20)
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category, "limit": limit}
-    if symbol:
-        params["symbol"] = symbol
-    if order_id:
-        params["orderId"] = order_id
-    if order_link_id:
-        params["orderLinkId"] = order_link_id
-    return format_response(private_session.get_open_orders(**params))
-
-
-def get_order_history(
+    params = build_params(
+        category=category,
+        limit=limit,
+        symbol=symbol,
+        orderId=order_id,
+        orderLinkId=order_link_id,
+    )
+    return format_response(await private_get("/v5/order/realtime", params))
+
+
+async def get_order_history(
     category: str,
     symbol: str | None = None,
     order_status: str | None = None,
@@ -213,52 +309,111 @@ def get_order_history(
 
     Args:
         category: Product type - spot, linear, inverse, option
-        symbol: Trading pair filter (optional)
-        order_status: Filter by status - Cancelled, Filled, Rejected, etc.
-        limit: Results per page 1-50 (default: 20)
+        symbol: Trading pair filter
+        order_status: Filter - Cancelled, Filled, Rejected, etc.
+        limit: Results 1-50 (default: 20)
         start_time: Start timestamp in milliseconds
         end_time: End timestamp in milliseconds
     """
-    _require_auth()
-    params: dict[str, Any] = {"category": category, "limit": limit}
-    if symbol:
-        params["symbol"] = symbol
-    if order_status:
-        params["orderStatus"] = order_status
-    if start_time:
-        params["startTime"] = start_time
-    if end_time:
-        params["endTime"] = end_time
-    return format_response(private_session.get_order_history(**params))
-
-
-def batch_place_orders(
+    params = build_params(
+        category=category,
+        limit=limit,
+        symbol=symbol,
+        orderStatus=order_status,
+        startTime=start_time or None,
+        endTime=end_time or None,
+    )
+    return format_response(await private_get("/v5/order/history", params))
+
+
+def _merge_batch(response: dict[str, Any]) -> dict[str, Any]:
+    """Result list of a successful batch call alongside its per-order codes."""
+    return {
+        "list": response["result"].get("list", []),
+        "retExtInfo": {"list": response.get("retExtInfo", {}).get("list", [])},
+    }
+
+
+async def _post_batches(
+    path: str,
+    category: str,
+    orders: list[dict[str, Any]],
+    *,
+    idempotent: bool,
+) -> dict[str, Any]:
+    """POST ``orders`` in concurrent chunks within Bybit's per-request limit.
+
+    Per-order outcomes are merged in input order, mirroring Bybit's own batch
+    response: ``list`` holds the order entries and ``retExtInfo.list`` their
+    codes. A chunk that fails outright reports its error for each of its orders.
+    """
+    size = _BATCH_LIMITS.get(category, 20)
+    # An empty list still goes out once so Bybit reports the validation error
+    chunks = [orders[i : i + size] for i in range(0, len(orders), size)] or [orders]
+    responses = await asyncio.gather(
+        *(
+            private_post(
+                path,
+                {"category": category, "request": chunk},
+                # Orders that all carry an orderLinkId can't be placed twice
+                idempotent=idempotent or all(order.get("orderLinkId") for order in chunk),
+            )
+            for chunk in chunks
+        ),
+        return_exceptions=True,
+    )
+    if len(responses) == 1:
+        # A single request keeps the plain single-call behaviour
+        first = responses[0]
+        if isinstance(first, BaseException):
+            raise first
+        return _merge_batch(first) if first.get("retCode") == 0 else format_response(first)
+
+    items: list[dict[str, Any]] = []
+    codes: list[dict[str, Any]] = []
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, BaseException):
+            failure = {"code": None, "msg": f"{type(response).__name__}: {response}"}
+        elif response.get("retCode") != 0:
+            failure = {"code": response.get("retCode"), "msg": response.get("retMsg")}
+        else:
+            merged = _merge_batch(response)
+            items.extend(merged["list"])
+            codes.extend(merged["retExtInfo"]["list"])
+            continue
+        for order in chunk:
+            items.append(
+                {
+                    "symbol": order.get("symbol", ""),
+                    "orderId": order.get("orderId", ""),
+                    "orderLinkId": order.get("orderLinkId", ""),
+                }
+            )
+            codes.append(failure)
+    return {"list": items, "retExtInfo": {"list": codes}}
+
+
+async def batch_place_orders(
     category: str,
     orders: list[dict[str, Any]],
 ) -> dict[str, Any]:
-    """Place multiple orders in a single request (up to 20).
+    """Place multiple orders, split into concurrent batches of 20 (10 for spot).
 
     Args:
         category: Product type - linear, inverse, spot, option
-        orders: List of order dicts, each with: symbol, side, orderType, qty, and optional price, timeInForce, etc.
+        orders: List of order objects. Each must have: symbol, side, orderType, qty. Optional: price, timeInForce, positionIdx, etc.
     """
-    _require_auth()
-    return format_response(
-        private_session.place_batch_order(category=category, request=orders)
-    )
+    return await _post_batches("/v5/order/create-batch", category, orders, idempotent=False)
 
 
-def batch_cancel_orders(
+async def batch_cancel_orders(
     category: str,
     orders: list[dict[str, Any]],
 ) -> dict[str, Any]:
-    """Cancel multiple orders in a single request.
+    """Cancel multiple orders, split into concurrent batches of 20 (10 for spot).
 
     Args:
         category: Product type - linear, inverse, spot, option
-        orders: List of dicts with symbol and either orderId or orderLinkId
+        orders: List of objects with symbol and either orderId or orderLinkId
     """
-    _require_auth()
-    return format_response(
-        private_session.cancel_batch_order(category=category, request=orders)
-    )
+    return await _post_batches("/v5/order/cancel-batch", category, orders, idempotent=True)
@@ -0,0 +1,47 @@
+"""Short-lived memoization for read-mostly Bybit endpoints."""
+
+import functools
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def ttl_cache(seconds: float | Callable[..., float], *, maxsize: int = 512) -> Callable[[F], F]:
+    """Memoize an async function's results per argument tuple for ``seconds``.
+
+    ``seconds`` may instead be a callable taking the same arguments as the
+    function and returning the TTL for that call; a TTL of 0 skips caching.
+    At most ``maxsize`` entries are kept, evicting the least recently used.
+    Exceptions and ``format_response`` error dicts are not cached, and calls
+    with unhashable arguments (e.g. a list of symbols) go straight through.
+    """
+    ttl = seconds if callable(seconds) else lambda *args, **kwargs: seconds
+
+    def decorator(fn: F) -> F:
+        entries: dict[Any, tuple[float, Any]] = {}
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            try:
+                hash(key)  # an empty dict's pop() wouldn't check
+            except TypeError:
+                return await fn(*args, **kwargs)
+            entry = entries.pop(key, None)
+            if entry is not None and entry[0] > time.monotonic():
+                entries[key] = entry  # re-insert as most recently used
+                return entry[1]
+            value = await fn(*args, **kwargs)
+            lifetime = ttl(*args, **kwargs)
+            if lifetime > 0 and not (isinstance(value, dict) and value.get("error") is True):
+                if len(entries) >= maxsize:
+                    del entries[next(iter(entries))]
+                entries[key] = (time.monotonic() + lifetime, value)
+            return value
+
+        wrapper.cache_clear = entries.clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -3,10 +3,15 @@ from typing import Any
 
 def format_response(data: dict[str, Any]) -> dict[str, Any]:
     """Extract and return the Bybit API response consistently."""
-    if data.get("retCode") != 0:
-        return {
+    code = data.get("retCode")
+    if code != 0:
+        error = {
             "error": True,
-            "code": data.get("retCode"),
+            "code": code,
             "message": data.get("retMsg", "Unknown error"),
         }
+        # Milliseconds until Bybit's rate-limit window resets, when throttled
+        if "retryAfter" in data:
+            error["retryAfter"] = data["retryAfter"]
+        return error
     return data.get("result", data)
@@ -0,0 +1,18 @@
+"""Request parameter assembly for Bybit v5 calls."""
+
+from typing import Any
+
+
+def build_params(**kwargs: Any) -> dict[str, Any]:
+    """Return the keyword arguments as Bybit params, dropping unset values.
+
+    ``None``, ``False`` and ``""`` are treated as "not provided"; ``0`` is kept
+    because several Bybit flags (``isLeverage``, ``withBonus``,
+    ``positionIdx``) use it as a real value. Where 0 means unset too, as for
+    timestamps, callers pass ``value or None``.
+    """
+    return {
+        key: value
+        for key, value in kwargs.items()
+        if value is not None and value is not False and value != ""
+    }
@@ -0,0 +1,68 @@
+"""Retry transient Bybit failures with full-jitter exponential backoff."""
+
+import asyncio
+import enum
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+MAX_ATTEMPTS = 3
+MAX_BACKOFF = 30.0
+BASE_BACKOFF = 0.5
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+# Timestamp out of recv_window, rate limited, server timeout, service busy
+RETRY_CODES = frozenset({10002, 10006, 10016, 170007})
+
+
+class Verdict(enum.Enum):
+    OK = "ok"
+    RETRY = "retry"
+    ABORT = "abort"
+
+
+def classify(outcome: dict[str, Any] | Exception) -> Verdict:
+    """Decide whether a decoded response body or a raised error is worth retrying."""
+    if isinstance(outcome, httpx.HTTPStatusError):
+        return Verdict.RETRY if outcome.response.status_code in RETRY_STATUS else Verdict.ABORT
+    if isinstance(outcome, httpx.TransportError):
+        return Verdict.RETRY
+    if isinstance(outcome, Exception):
+        return Verdict.ABORT
+    ret_code = outcome.get("retCode")
+    if ret_code == 0:
+        return Verdict.OK
+    return Verdict.RETRY if ret_code in RETRY_CODES else Verdict.ABORT
+
+
+async def with_retry(
+    fn: Callable[[], Awaitable[dict[str, Any]]],
+    *,
+    idempotent: bool,
+    classify: Callable[[dict[str, Any] | Exception], Verdict] = classify,
+    recover: Callable[[], Awaitable[dict[str, Any] | None]] | None = None,
+) -> dict[str, Any]:
+    """Await ``fn()``, retrying up to ``MAX_ATTEMPTS`` times on transient failures.
+
+    Non-idempotent calls are never retried: a timed-out order may still have
+    reached the matching engine. Before each retry, ``recover()`` (if given)
+    can look up whether the earlier attempt took effect after all; a non-None
+    result is returned in place of resending.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt and recover is not None:
+            recovered = await recover()
+            if recovered is not None:
+                return recovered
+        try:
+            outcome: dict[str, Any] | Exception = await fn()
+        except Exception as exc:
+            outcome = exc
+        if not idempotent or attempt == MAX_ATTEMPTS - 1 or classify(outcome) is not Verdict.RETRY:
+            break
+        await asyncio.sleep(random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2**attempt)))
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
@@ -0,0 +1,33 @@
+"""JSON encode/decode helpers backed by orjson when it is installed."""
+
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the "fast" extra
+    orjson = None
+
+if orjson is not None:
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize to compact JSON bytes."""
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any) -> str:
+        """Serialize to compact JSON text."""
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+
+else:
+    import json
+
+    def dumpb(obj: Any) -> bytes:
+        """Serialize to compact JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def dumps(obj: Any) -> str:
+        """Serialize to compact JSON text."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
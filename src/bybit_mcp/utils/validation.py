@@ -0,0 +1,52 @@
+"""Client-side checks for order parameters.
+
+Malformed values are rejected here, before a request takes an admission
+slot or a rate-limit token only to come back as Bybit's 10001 params error.
+"""
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+CATEGORIES = frozenset({"spot", "linear", "inverse", "option"})
+SIDES = frozenset({"Buy", "Sell"})
+
+# Plain ASCII decimal as Bybit expects it: no sign, exponent, whitespace, or
+# non-ASCII digits (which \d and float() would both accept)
+_DECIMAL = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+# Bybit's orderLinkId: up to 36 letters, digits, dashes, or underscores
+_ORDER_LINK_ID = re.compile(r"[A-Za-z0-9_-]{1,36}")
+
+
+def _error(message: str) -> dict[str, Any]:
+    return {"error": True, "code": -1, "message": message}
+
+
+def order_error(
+    category: str,
+    *,
+    categories: frozenset[str] = CATEGORIES,
+    side: str | None = None,
+    order_link_id: str | None = None,
+    positive: Iterable[tuple[str, str]] = (),
+    decimals: Iterable[tuple[str, str | None]] = (),
+) -> dict[str, Any] | None:
+    """Return a ``format_response``-style error for the first bad field, else None.
+
+    ``positive`` fields are required and must be decimals above zero;
+    ``decimals`` fields are optional (None or "" are skipped) but must be
+    plain non-negative decimals when given.
+    """
+    if category not in categories:
+        return _error(f"category must be one of {', '.join(sorted(categories))}, got {category!r}")
+    if side is not None and side not in SIDES:
+        return _error(f"side must be Buy or Sell, got {side!r}")
+    if order_link_id and not _ORDER_LINK_ID.fullmatch(order_link_id):
+        return _error("order_link_id must be 1-36 letters, digits, '-' or '_'")
+    for name, value in positive:
+        if not (isinstance(value, str) and _DECIMAL.fullmatch(value) and float(value) > 0):
+            return _error(f"{name} must be a positive decimal string, got {value!r}")
+    for name, value in decimals:
+        if value and not (isinstance(value, str) and _DECIMAL.fullmatch(value)):
+            return _error(f"{name} must be a decimal string, got {value!r}")
+    return None
@@ -0,0 +1,75 @@
+"""Shared fixtures: a mocked Bybit REST API behind the real client."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+
+from bybit_mcp import client as client_module
+from bybit_mcp.admission import AdmissionController
+from bybit_mcp.signer import RequestSigner
+from bybit_mcp.utils import retry as retry_module
+from bybit_mcp.utils.serialization import dumpb
+
+API_KEY = "test-api-key"
+API_SECRET = "test-api-secret"
+
+Handler = Callable[[httpx.Request], httpx.Response | Awaitable[httpx.Response]]
+
+
+def bybit_response(result: object = None, ret_code: int = 0, **extra: object) -> httpx.Response:
+    """A Bybit v5 JSON envelope; ``retMsg`` is "OK" for success."""
+    body = {"retCode": ret_code, "retMsg": "OK" if ret_code == 0 else "error", **extra}
+    body["result"] = {} if result is None else result
+    return httpx.Response(200, content=dumpb(body))
+
+
+class MockBybit:
+    """Records every request and answers it with ``handler`` (sync or async)."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.handler: Handler = lambda request: bybit_response()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.handler(request)
+        if isinstance(response, Awaitable):
+            response = await response
+        return response
+
+    def paths(self) -> list[str]:
+        return [request.url.path for request in self.requests]
+
+
+@pytest.fixture
+def bybit(monkeypatch: pytest.MonkeyPatch) -> MockBybit:
+    """Route client.py through a MockTransport, signed with test credentials."""
+    mock = MockBybit()
+    http = httpx.AsyncClient(base_url="https://api.bybit.test", transport=httpx.MockTransport(mock))
+    signer = RequestSigner(API_KEY, API_SECRET)
+    monkeypatch.setattr(client_module, "get_http_client", lambda: http)
+    monkeypatch.setattr(client_module, "require_signer", lambda: signer)
+    # Fresh controller and limiters so one test's traffic can't slow the next
+    monkeypatch.setattr(client_module, "admission", AdmissionController())
+    for name in ("public_limiter", "private_limiter", "order_limiter", "position_limiter"):
+        shared = getattr(client_module, name)
+        fresh = AsyncLimiter(shared.max_rate, shared.time_period)
+        monkeypatch.setattr(client_module, name, fresh)
+    return mock
+
+
+@pytest.fixture
+def backoffs(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Skip retry backoff sleeps, recording the requested delays."""
+    delays: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", sleep)
+    return delays
@@ -0,0 +1,48 @@
+"""Tests for the AIMD admission controller."""
+
+import asyncio
+
+from bybit_mcp.admission import AdmissionController
+
+
+class TestAdmissionController:
+    def test_rate_limit_code_halves_limit(self):
+        controller = AdmissionController(initial=10)
+        controller.observe({}, 10006, 0.1)
+        assert controller.limit == 5
+
+    def test_low_quota_header_decreases(self):
+        controller = AdmissionController(initial=10)
+        controller.observe({"X-Bapi-Limit": "50", "X-Bapi-Limit-Status": "5"}, 0, 0.1)
+        assert controller.limit == 5
+
+    def test_success_increases_additively_up_to_max(self):
+        controller = AdmissionController(initial=39, maximum=40)
+        for _ in range(5):
+            controller.observe({"X-Bapi-Limit": "50", "X-Bapi-Limit-Status": "40"}, 0, 0.1)
+        assert controller.limit == 40
+
+    def test_slow_success_holds_limit(self):
+        controller = AdmissionController(initial=10, target_latency=1.0)
+        controller.observe({}, 0, 2.5)
+        assert controller.limit == 10
+
+    def test_limit_never_drops_below_minimum(self):
+        controller = AdmissionController(initial=4, minimum=2)
+        for _ in range(5):
+            controller.decrease()
+        assert controller.limit == 2
+
+    async def test_slot_caps_concurrency(self):
+        controller = AdmissionController(initial=3)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(20)))
+        assert peak == 3
+        assert controller.in_flight == 0
@@ -4,8 +4,17 @@ import time
 
 import jwt
 import pytest
-
-from bybit_mcp.auth import BybitOAuthProvider, InvalidPINError, RateLimiter, _JWT_ALGORITHM
+from mcp.shared.auth import OAuthClientInformationFull
+
+from bybit_mcp.auth import (
+    BybitOAuthProvider,
+    InvalidPINError,
+    PendingConsent,
+    RateLimiter,
+    RevokedTokens,
+    _AUTH_CODE_TTL,
+    _JWT_ALGORITHM,
+)
 
 # Shared test secret
 _SECRET = "test-secret-key-for-unit-tests"
@@ -16,14 +25,42 @@ _SECRET = "test-secret-key-for-unit-tests"
 # ---------------------------------------------------------------------------
 
 
+# Validated once; no test mutates the client, so every test can share it
+_CLIENT_INFO = OAuthClientInformationFull(
+    client_id="test-client-id",
+    redirect_uris=["http://localhost:3000/callback"],
+)
+
+
 def _make_client_info():
-    """Create a minimal OAuthClientInformationFull-like object for testing."""
-    from mcp.shared.auth import OAuthClientInformationFull
+    """Return the shared minimal OAuthClientInformationFull for testing."""
+    return _CLIENT_INFO
+
 
-    return OAuthClientInformationFull(
-        client_id="test-client-id",
-        redirect_uris=["http://localhost:3000/callback"],
+def _setup_consent(provider: BybitOAuthProvider) -> str:
+    """Register a client and create a pending consent, return consent_id."""
+    import secrets as _secrets
+
+    from mcp.server.auth.provider import AuthorizationParams
+
+    client = _make_client_info()
+    provider.clients[client.client_id] = client
+
+    consent_id = _secrets.token_urlsafe(16)
+    params = AuthorizationParams(
+        state="test-state",
+        scopes=["all"],
+        code_challenge="test-challenge",
+        code_challenge_method="S256",
+        redirect_uri="http://localhost:3000/callback",
+        redirect_uri_provided_explicitly=True,
+        response_type="code",
+        client_id=client.client_id,
     )
+    # Same bookkeeping as authorize(), so expiry sweeps see the consent
+    provider.pending_consents[consent_id] = PendingConsent(client, params)
+    provider._consent_order.append(consent_id)
+    return consent_id
 
 
 # ---------------------------------------------------------------------------
@@ -32,7 +69,6 @@ def _make_client_info():
 
 
 class TestRegistration:
-    @pytest.mark.asyncio
     async def test_allows_registration_without_restrictions(self):
         """Registration is open — no software_id / token needed."""
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="my-pin")
@@ -47,44 +83,21 @@ class TestRegistration:
 
 
 class TestConsentPIN:
-    def _setup_consent(self, provider: BybitOAuthProvider) -> str:
-        """Register a client and create a pending consent, return consent_id."""
-        import secrets as _secrets
-
-        from mcp.server.auth.provider import AuthorizationParams
-
-        client = _make_client_info()
-        provider.clients[client.client_id] = client
-
-        consent_id = _secrets.token_urlsafe(16)
-        params = AuthorizationParams(
-            state="test-state",
-            scopes=["all"],
-            code_challenge="test-challenge",
-            code_challenge_method="S256",
-            redirect_uri="http://localhost:3000/callback",
-            redirect_uri_provided_explicitly=True,
-            response_type="code",
-            client_id=client.client_id,
-        )
-        provider.pending_consents[consent_id] = (client, params)
-        return consent_id
-
     def test_rejects_approve_without_pin(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="secret-pin")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
         with pytest.raises(ValueError, match="Invalid PIN"):
             provider.approve_consent(consent_id, pin="")
 
     def test_rejects_approve_with_wrong_pin(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="secret-pin")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
         with pytest.raises(ValueError, match="Invalid PIN"):
             provider.approve_consent(consent_id, pin="wrong-pin")
 
     def test_approves_with_correct_pin(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="secret-pin")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
         redirect_url = provider.approve_consent(consent_id, pin="secret-pin")
         assert "code=" in redirect_url
         # Consent consumed
@@ -92,14 +105,21 @@ class TestConsentPIN:
 
     def test_approves_without_pin_when_not_configured(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
         redirect_url = provider.approve_consent(consent_id, pin="")
         assert "code=" in redirect_url
 
+    def test_rejects_wrong_pin_of_same_length(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="secret-pin")
+        consent_id = _setup_consent(provider)
+        with pytest.raises(InvalidPINError, match="Invalid PIN"):
+            provider.approve_consent(consent_id, pin="secret-pun")
+        assert provider.pending_consents[consent_id].pin_failures == 1
+
     def test_consent_not_consumed_on_wrong_pin(self):
         """Wrong PIN must NOT consume the pending consent."""
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="correct-pin")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
 
         with pytest.raises(InvalidPINError):
             provider.approve_consent(consent_id, pin="wrong-pin")
@@ -110,7 +130,7 @@ class TestConsentPIN:
     def test_brute_force_lockout_after_max_attempts(self):
         """After 5 wrong PINs, consent is cancelled and removed."""
         provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="correct-pin")
-        consent_id = self._setup_consent(provider)
+        consent_id = _setup_consent(provider)
 
         for _ in range(5):
             with pytest.raises(InvalidPINError, match="Invalid PIN"):
@@ -128,83 +148,106 @@ class TestConsentPIN:
         with pytest.raises(ValueError, match="Invalid or expired"):
             provider.approve_consent("nonexistent-id", pin="pin")
 
+    def test_rejects_expired_consent(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="")
+        consent_id = _setup_consent(provider)
+        provider.pending_consents[consent_id].created_at -= _AUTH_CODE_TTL + 1
+        with pytest.raises(ValueError, match="Invalid or expired"):
+            provider.approve_consent(consent_id, pin="")
+        assert consent_id not in provider.pending_consents
+
+    async def test_cleanup_removes_only_expired_consents(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        old_id = _setup_consent(provider)
+        new_id = _setup_consent(provider)
+        # Age the first consent past its TTL
+        provider.pending_consents[old_id].created_at -= _AUTH_CODE_TTL + 1
+
+        provider.cleanup_expired_consents()
+
+        assert old_id not in provider.pending_consents
+        assert new_id in provider.pending_consents
+
+    async def test_authorize_sweeps_abandoned_consents(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        old_id = _setup_consent(provider)
+        abandoned = provider.pending_consents[old_id]
+        abandoned.created_at -= _AUTH_CODE_TTL + 1
+
+        await provider.authorize(abandoned.client, abandoned.params)
+
+        assert old_id not in provider.pending_consents
+        assert len(provider.pending_consents) == 1
+
+
+# ---------------------------------------------------------------------------
+# Authorization code tests
+# ---------------------------------------------------------------------------
+
+
+class TestAuthorizationCodes:
+    async def test_expired_auth_code_not_loaded(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET, consent_pin="")
+        consent_id = _setup_consent(provider)
+        redirect_url = provider.approve_consent(consent_id, pin="")
+        code = redirect_url.split("code=")[1].split("&")[0]
+        client = _make_client_info()
+
+        assert await provider.load_authorization_code(client, code) is not None
+        provider.auth_codes[code].expires_at = time.time() - 1
+        assert await provider.load_authorization_code(client, code) is None
+        assert code not in provider.auth_codes
+
 
 # ---------------------------------------------------------------------------
 # JWT validation tests
 # ---------------------------------------------------------------------------
 
 
+_BASE_CLAIMS = {
+    "sub": "test",
+    "type": "access",
+    "scopes": [],
+    "iss": "bybit-mcp",
+    "aud": "bybit-mcp",
+    "jti": "test-jti",
+}
+
+
+def _encode_jwt(
+    *,
+    secret: str = _SECRET,
+    headers: dict | None = None,
+    drop: tuple[str, ...] = (),
+    **claims,
+) -> str:
+    """Sign a valid-for-an-hour token, with ``claims`` overridden and ``drop`` removed."""
+    now = int(time.time())
+    payload = {**_BASE_CLAIMS, "iat": now, "exp": now + 3600, **claims}
+    for claim in drop:
+        del payload[claim]
+    return jwt.encode(payload, secret, algorithm=_JWT_ALGORITHM, headers=headers)
+
+
 class TestJWTValidation:
-    @pytest.mark.asyncio
     async def test_rejects_expired_jwt(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
-        # Create an expired token manually
-        payload = {
-            "sub": "test",
-            "type": "access",
-            "scopes": [],
-            "iat": int(time.time()) - 7200,
-            "exp": int(time.time()) - 3600,  # expired 1 hour ago
-            "iss": "bybit-mcp",
-            "aud": "bybit-mcp",
-            "jti": "test-jti",
-        }
-        expired_token = jwt.encode(payload, _SECRET, algorithm=_JWT_ALGORITHM)
-        result = await provider.load_access_token(expired_token)
-        assert result is None
+        now = int(time.time())
+        expired_token = _encode_jwt(iat=now - 7200, exp=now - 3600)  # expired 1 hour ago
+        assert await provider.load_access_token(expired_token) is None
 
-    @pytest.mark.asyncio
     async def test_rejects_wrong_issuer(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
-        payload = {
-            "sub": "test",
-            "type": "access",
-            "scopes": [],
-            "iat": int(time.time()),
-            "exp": int(time.time()) + 3600,
-            "iss": "wrong-issuer",
-            "aud": "bybit-mcp",
-            "jti": "test-jti",
-        }
-        bad_token = jwt.encode(payload, _SECRET, algorithm=_JWT_ALGORITHM)
-        result = await provider.load_access_token(bad_token)
-        assert result is None
+        assert await provider.load_access_token(_encode_jwt(iss="wrong-issuer")) is None
 
-    @pytest.mark.asyncio
     async def test_rejects_wrong_audience(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
-        payload = {
-            "sub": "test",
-            "type": "access",
-            "scopes": [],
-            "iat": int(time.time()),
-            "exp": int(time.time()) + 3600,
-            "iss": "bybit-mcp",
-            "aud": "wrong-audience",
-            "jti": "test-jti",
-        }
-        bad_token = jwt.encode(payload, _SECRET, algorithm=_JWT_ALGORITHM)
-        result = await provider.load_access_token(bad_token)
-        assert result is None
+        assert await provider.load_access_token(_encode_jwt(aud="wrong-audience")) is None
 
-    @pytest.mark.asyncio
     async def test_rejects_wrong_secret(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
-        payload = {
-            "sub": "test",
-            "type": "access",
-            "scopes": [],
-            "iat": int(time.time()),
-            "exp": int(time.time()) + 3600,
-            "iss": "bybit-mcp",
-            "aud": "bybit-mcp",
-            "jti": "test-jti",
-        }
-        bad_token = jwt.encode(payload, "wrong-secret", algorithm=_JWT_ALGORITHM)
-        result = await provider.load_access_token(bad_token)
-        assert result is None
+        assert await provider.load_access_token(_encode_jwt(secret="wrong-secret")) is None
 
-    @pytest.mark.asyncio
     async def test_accepts_valid_jwt(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
         token = provider._create_jwt(sub="test", token_type="access", scopes=["all"], ttl=3600)
@@ -212,6 +255,101 @@ class TestJWTValidation:
         assert result is not None
         assert result.client_id == "test"
 
+    def test_issued_token_is_standard_jwt(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        token = provider._create_jwt(sub="test", token_type="access", scopes=["all"], ttl=3600)
+        payload = jwt.decode(
+            token, _SECRET, algorithms=[_JWT_ALGORITHM], issuer="bybit-mcp", audience="bybit-mcp"
+        )
+        assert payload["sub"] == "test"
+        assert payload["scopes"] == ["all"]
+
+    async def test_accepts_valid_jwt_with_extra_header(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        assert await provider.load_access_token(_encode_jwt(headers={"kid": "k1"})) is not None
+
+    async def test_rejects_jwt_missing_required_claim(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        assert await provider.load_access_token(_encode_jwt(drop=("sub",))) is None
+        token = _encode_jwt(drop=("sub",), headers={"kid": "k1"})
+        assert await provider.load_access_token(token) is None
+
+    async def test_rejects_alg_none(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        header, payload, _ = _encode_jwt().split(".")
+        unsigned = jwt.utils.base64url_encode(b'{"alg":"none","typ":"JWT"}').decode()
+        assert await provider.load_access_token(f"{unsigned}.{payload}.") is None
+        # Our own header with the signature stripped is no better
+        assert await provider.load_access_token(f"{header}.{payload}.") is None
+
+    async def test_rejects_other_hmac_algorithm(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        now = int(time.time())
+        payload = {**_BASE_CLAIMS, "iat": now, "exp": now + 3600}
+        token = jwt.encode(payload, _SECRET, algorithm="HS512")
+        assert await provider.load_access_token(token) is None
+
+
+# ---------------------------------------------------------------------------
+# Opaque access token tests
+# ---------------------------------------------------------------------------
+
+
+class TestOpaqueAccessTokens:
+    @staticmethod
+    def _auth_code(client_id: str):
+        from mcp.server.auth.provider import AuthorizationCode
+
+        return AuthorizationCode(
+            code="test-code",
+            scopes=["all"],
+            expires_at=time.time() + 600,
+            client_id=client_id,
+            code_challenge="test-challenge",
+            redirect_uri="http://localhost:3000/callback",
+            redirect_uri_provided_explicitly=True,
+        )
+
+    async def test_exchange_issues_opaque_access_token(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        client = _make_client_info()
+        token = await provider.exchange_authorization_code(client, self._auth_code(client.client_id))
+
+        assert token.access_token.count(".") != 2  # not a JWT
+        result = await provider.load_access_token(token.access_token)
+        assert result is not None
+        assert result.client_id == client.client_id
+        assert result.scopes == ["all"]
+
+    async def test_rejects_expired_opaque_token(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        client = _make_client_info()
+        token = await provider.exchange_authorization_code(client, self._auth_code(client.client_id))
+
+        provider.access_tokens[token.access_token].expires_at = int(time.time()) - 1
+        assert await provider.load_access_token(token.access_token) is None
+        assert token.access_token not in provider.access_tokens
+
+    async def test_revoke_opaque_token(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        client = _make_client_info()
+        token = await provider.exchange_authorization_code(client, self._auth_code(client.client_id))
+
+        result = await provider.load_access_token(token.access_token)
+        await provider.revoke_token(result)
+        assert await provider.load_access_token(token.access_token) is None
+
+    async def test_use_jwt_issues_jwt_access_token(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET, use_jwt=True)
+        client = _make_client_info()
+        token = await provider.exchange_authorization_code(client, self._auth_code(client.client_id))
+
+        assert token.access_token.count(".") == 2
+        assert provider.access_tokens == {}
+        result = await provider.load_access_token(token.access_token)
+        assert result is not None
+        assert result.client_id == client.client_id
+
 
 # ---------------------------------------------------------------------------
 # API key tests
@@ -219,7 +357,6 @@ class TestJWTValidation:
 
 
 class TestAPIKeyAuth:
-    @pytest.mark.asyncio
     async def test_accepts_valid_api_key(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, api_key="my-api-key")
         result = await provider.load_access_token("my-api-key")
@@ -227,13 +364,11 @@ class TestAPIKeyAuth:
         assert result.client_id == "api-key"
         assert result.scopes == ["all"]
 
-    @pytest.mark.asyncio
     async def test_rejects_wrong_api_key(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, api_key="my-api-key")
         result = await provider.load_access_token("wrong-key")
         assert result is None
 
-    @pytest.mark.asyncio
     async def test_no_api_key_configured(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET, api_key="")
         result = await provider.load_access_token("any-key")
@@ -246,7 +381,6 @@ class TestAPIKeyAuth:
 
 
 class TestTokenRevocation:
-    @pytest.mark.asyncio
     async def test_revoke_access_token(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
         token_str = provider._create_jwt(sub="test", token_type="access", scopes=[], ttl=3600)
@@ -262,7 +396,6 @@ class TestTokenRevocation:
         result2 = await provider.load_access_token(token_str)
         assert result2 is None
 
-    @pytest.mark.asyncio
     async def test_revoke_does_not_affect_other_tokens(self):
         provider = BybitOAuthProvider(oauth_secret=_SECRET)
         token1 = provider._create_jwt(sub="test", token_type="access", scopes=[], ttl=3600)
@@ -276,6 +409,69 @@ class TestTokenRevocation:
         assert result2 is not None
 
 
+class TestVerifiedTokenCache:
+    async def test_repeat_load_skips_verification(self, monkeypatch):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        token_str = provider._create_jwt(sub="test", token_type="access", scopes=[], ttl=3600)
+        first = await provider.load_access_token(token_str)
+
+        def fail(token):
+            raise AssertionError("cached token was verified again")
+
+        monkeypatch.setattr(provider, "_verify_jwt", fail)
+        assert await provider.load_access_token(token_str) is first
+
+    async def test_cached_token_expires(self, monkeypatch):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        token_str = provider._create_jwt(sub="test", token_type="access", scopes=[], ttl=60)
+        assert await provider.load_access_token(token_str) is not None
+
+        later = time.time() + 120
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert await provider.load_access_token(token_str) is None
+
+    async def test_failed_verification_is_not_cached(self):
+        provider = BybitOAuthProvider(oauth_secret=_SECRET)
+        token_str = provider._create_jwt(sub="test", token_type="refresh", scopes=[], ttl=3600)
+        assert await provider.load_access_token(token_str) is None
+        assert not provider._verified_tokens
+
+
+class TestRevokedTokens:
+    def test_contains_only_added_jtis(self):
+        revoked = RevokedTokens()
+        revoked.add("jti-a", time.time() + 60)
+        assert "jti-a" in revoked
+        assert "jti-b" not in revoked
+        assert None not in revoked
+
+    def test_cleanup_drops_expired_entries(self):
+        revoked = RevokedTokens()
+        now = time.time()
+        revoked.add("expired", now - 1)
+        revoked.add("live", now + 60)
+
+        revoked.cleanup(now)
+
+        assert "expired" not in revoked
+        assert "live" in revoked
+        assert len(revoked) == 1
+
+    def test_add_sweeps_at_most_once_per_interval(self, monkeypatch):
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        revoked = RevokedTokens()
+        revoked.add("expired", now - 1)
+        revoked.add("live", now + 3600)
+        assert len(revoked) == 2  # no sweep yet
+
+        now += RevokedTokens._SWEEP_INTERVAL
+        revoked.add("next", now + 3600)
+
+        assert "expired" not in revoked
+        assert len(revoked) == 2
+
+
 # ---------------------------------------------------------------------------
 # Rate limiter tests
 # ---------------------------------------------------------------------------
@@ -300,3 +496,23 @@ class TestRateLimiter:
         assert limiter.check("key-a") is True
         assert limiter.check("key-a") is False
         assert limiter.check("key-b") is True  # Different key, not limited
+
+    def test_sweeps_keys_idle_for_a_window(self, monkeypatch):
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        now = time.monotonic()
+        limiter.check("key-a")
+        monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+        assert limiter.check("key-b") is True
+        assert len(limiter._buckets) == 1
+
+    def test_refills_at_window_rate(self, monkeypatch):
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        assert limiter.check("key") is True
+        assert limiter.check("key") is True
+        assert limiter.check("key") is False
+        # One request's worth of capacity returns every window / max_requests
+        monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+        assert limiter.check("key") is True
+        assert limiter.check("key") is False
@@ -0,0 +1,124 @@
+"""Tests for the ttl_cache decorator and the market data TTL rules."""
+
+import types
+
+import pytest
+
+from bybit_mcp.tools import market
+from bybit_mcp.utils import cache as cache_module
+from bybit_mcp.utils.cache import ttl_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the cache's monotonic clock; advance it by assigning ``clock.now``."""
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.monotonic = lambda: fake.now
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+def _counting(results=None):
+    """An async function returning ``results[call]`` (or the call count) per call."""
+    calls = []
+
+    async def fetch(*args, **kwargs):
+        calls.append((args, kwargs))
+        return results[len(calls) - 1] if results else {"call": len(calls)}
+
+    return fetch, calls
+
+
+class TestTTLCache:
+    async def test_hit_until_expiry(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(10)(fetch)
+        assert await cached("BTCUSDT") == {"call": 1}
+        clock.now += 9.9
+        assert await cached("BTCUSDT") == {"call": 1}
+        clock.now += 0.2
+        assert await cached("BTCUSDT") == {"call": 2}
+        assert len(calls) == 2
+
+    async def test_keys_on_args_and_kwargs(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(10)(fetch)
+        await cached("BTCUSDT")
+        await cached("ETHUSDT")
+        await cached("BTCUSDT", limit=5)
+        await cached("BTCUSDT", limit=5)
+        assert len(calls) == 3
+
+    async def test_kwarg_order_does_not_matter(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(10)(fetch)
+        await cached("BTCUSDT", limit=5, interval="1")
+        await cached("BTCUSDT", interval="1", limit=5)
+        assert len(calls) == 1
+
+    async def test_unhashable_arguments_bypass_cache(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(10)(fetch)
+        assert await cached(["BTCUSDT", "ETHUSDT"]) == {"call": 1}
+        assert await cached(symbols=["BTCUSDT"]) == {"call": 2}
+        assert len(calls) == 2
+
+    async def test_error_results_are_not_cached(self, clock):
+        error = {"error": True, "code": 10006, "message": "Too many visits"}
+        fetch, calls = _counting([error, {"ok": 1}])
+        cached = ttl_cache(10)(fetch)
+        assert await cached("BTCUSDT") == error
+        assert await cached("BTCUSDT") == {"ok": 1}
+        assert await cached("BTCUSDT") == {"ok": 1}
+        assert len(calls) == 2
+
+    async def test_per_call_ttl_of_zero_bypasses_cache(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(lambda symbol, final=False: 60 if final else 0)(fetch)
+        await cached("BTCUSDT")
+        await cached("BTCUSDT")
+        await cached("BTCUSDT", final=True)
+        await cached("BTCUSDT", final=True)
+        assert len(calls) == 3
+
+    async def test_evicts_least_recently_used(self, clock):
+        fetch, calls = _counting()
+        cached = ttl_cache(60, maxsize=2)(fetch)
+        await cached("a")
+        await cached("b")
+        await cached("a")  # "b" is now the oldest
+        await cached("c")
+        await cached("a")
+        assert len(calls) == 3
+        await cached("b")
+        assert len(calls) == 4
+
+
+class TestMarketTTLs:
+    def test_open_kline_window_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(market, "_now_ms", lambda: 10_000_000)
+        assert market._kline_ttl("BTCUSDT", "1") == 0
+        # Ends within the last two candles: the newest may still change
+        assert market._kline_ttl("BTCUSDT", "1", end=10_000_000 - 60_000) == 0
+
+    def test_closed_kline_window_is_cached_long(self, monkeypatch):
+        monkeypatch.setattr(market, "_now_ms", lambda: 10_000_000)
+        end = 10_000_000 - 3 * 60_000
+        assert market._kline_ttl("BTCUSDT", "1", end=end) == market._HISTORICAL_TTL
+        assert market._kline_ttl("BTCUSDT", "D", end=end) == 0
+
+    def test_funding_ttl(self, monkeypatch):
+        monkeypatch.setattr(market, "_now_ms", lambda: 10_000_000)
+        assert market._funding_ttl("BTCUSDT") == 60
+        assert market._funding_ttl("BTCUSDT", end_time=9_000_000) == market._HISTORICAL_TTL
+
+    async def test_get_klines_caches_only_closed_windows(self, bybit, monkeypatch):
+        monkeypatch.setattr(market, "_now_ms", lambda: 10_000_000)
+        market.get_klines.cache_clear()
+        await market.get_klines("BTCUSDT", "1")
+        await market.get_klines("BTCUSDT", "1")
+        assert len(bybit.requests) == 2
+        await market.get_klines("BTCUSDT", "1", end=1_000_000)
+        await market.get_klines("BTCUSDT", "1", end=1_000_000)
+        assert len(bybit.requests) == 3
+        market.get_klines.cache_clear()
@@ -0,0 +1,126 @@
+"""Tests for request signing and response handling in the REST client."""
+
+import asyncio
+import hashlib
+import hmac
+
+import httpx
+
+from bybit_mcp.client import private_get, private_post, public_get
+from bybit_mcp.signer import RECV_WINDOW
+from bybit_mcp.utils.formatters import format_response
+from tests.conftest import API_KEY, API_SECRET, bybit_response
+
+
+def _expected_signature(request: httpx.Request, payload: str) -> str:
+    """Bybit v5: HMAC-SHA256 over timestamp + api_key + recv_window + payload."""
+    timestamp = request.headers["X-BAPI-TIMESTAMP"]
+    message = f"{timestamp}{API_KEY}{RECV_WINDOW}{payload}".encode()
+    return hmac.new(API_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+class TestSigning:
+    async def test_get_signs_query_string_as_sent(self, bybit):
+        await private_get("/v5/order/realtime", {"category": "linear", "symbol": "BTCUSDT"})
+        (request,) = bybit.requests
+        query = request.url.query.decode()
+        assert query == "category=linear&symbol=BTCUSDT"
+        assert request.headers["X-BAPI-API-KEY"] == API_KEY
+        assert request.headers["X-BAPI-RECV-WINDOW"] == RECV_WINDOW
+        assert request.headers["X-BAPI-SIGN-TYPE"] == "2"
+        assert request.headers["X-BAPI-SIGN"] == _expected_signature(request, query)
+
+    async def test_post_signs_body_bytes_as_sent(self, bybit):
+        await private_post("/v5/order/cancel", {"category": "linear", "symbol": "BTCUSDT"})
+        (request,) = bybit.requests
+        body = request.content.decode()
+        assert body == '{"category":"linear","symbol":"BTCUSDT"}'
+        assert request.headers["Content-Type"] == "application/json"
+        assert request.headers["X-BAPI-SIGN"] == _expected_signature(request, body)
+
+    async def test_public_get_is_unsigned(self, bybit):
+        await public_get("/v5/market/time")
+        (request,) = bybit.requests
+        assert "X-BAPI-SIGN" not in request.headers
+
+
+class TestErrorMapping:
+    async def test_nonzero_ret_code_becomes_error_dict(self, bybit):
+        bybit.handler = lambda request: bybit_response(ret_code=110007)
+        result = format_response(await private_post("/v5/order/create", {"category": "spot"}))
+        assert result == {"error": True, "code": 110007, "message": "error"}
+
+    async def test_http_client_error_becomes_error_dict(self, bybit):
+        bybit.handler = lambda request: httpx.Response(403)
+        result = format_response(await private_get("/v5/account/wallet-balance"))
+        assert result == {"error": True, "code": 403, "message": "HTTP 403 Forbidden"}
+        assert len(bybit.requests) == 1  # not retried
+
+    async def test_http_server_error_becomes_error_dict_after_retries(self, bybit, backoffs):
+        bybit.handler = lambda request: httpx.Response(502)
+        result = format_response(await public_get("/v5/market/time"))
+        assert result == {"error": True, "code": 502, "message": "HTTP 502 Bad Gateway"}
+        assert len(bybit.requests) == 3
+
+    async def test_transport_error_becomes_error_dict_after_retries(self, bybit, backoffs):
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        bybit.handler = handler
+        result = format_response(await public_get("/v5/market/time"))
+        assert result == {"error": True, "code": -1, "message": "ConnectError: connection refused"}
+        assert len(bybit.requests) == 3
+
+    async def test_non_json_body_becomes_error_dict(self, bybit):
+        bybit.handler = lambda request: httpx.Response(200, text="<html>Maintenance</html>")
+        result = format_response(await private_get("/v5/account/wallet-balance"))
+        assert result == {"error": True, "code": -1, "message": "HTTP 200: non-JSON response"}
+        assert len(bybit.requests) == 1  # not retried
+
+    async def test_success_returns_result(self, bybit):
+        bybit.handler = lambda request: bybit_response({"timeSecond": "1"})
+        assert format_response(await public_get("/v5/market/time")) == {"timeSecond": "1"}
+
+
+class TestPublicGetCoalescing:
+    @staticmethod
+    def _gated(bybit):
+        """Hold every response until the returned event is set."""
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return bybit_response({"symbol": request.url.params["symbol"]})
+
+        bybit.handler = handler
+        return release
+
+    async def test_identical_concurrent_gets_share_one_request(self, bybit):
+        release = self._gated(bybit)
+        params = {"category": "linear", "symbol": "BTCUSDT"}
+        callers = [asyncio.create_task(public_get("/v5/market/tickers", params)) for _ in range(3)]
+        other = asyncio.create_task(
+            public_get("/v5/market/tickers", {"category": "linear", "symbol": "ETHUSDT"})
+        )
+        await asyncio.sleep(0.01)
+        release.set()
+
+        results = await asyncio.gather(*callers)
+        assert all(result["result"]["symbol"] == "BTCUSDT" for result in results)
+        assert (await other)["result"]["symbol"] == "ETHUSDT"
+        assert len(bybit.requests) == 2
+
+    async def test_cancelled_caller_leaves_others_result_intact(self, bybit):
+        release = self._gated(bybit)
+        params = {"category": "linear", "symbol": "BTCUSDT"}
+        first = asyncio.create_task(public_get("/v5/market/tickers", params))
+        second = asyncio.create_task(public_get("/v5/market/tickers", params))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert (await second)["result"]["symbol"] == "BTCUSDT"
+        assert first.cancelled()
+        assert len(bybit.requests) == 1
@@ -0,0 +1,39 @@
+"""Tests for request parameter assembly and what the tools send."""
+
+from bybit_mcp.tools import account, position
+from bybit_mcp.utils.params import build_params
+from bybit_mcp.utils.serialization import loads
+
+
+class TestBuildParams:
+    def test_drops_unset_values(self):
+        assert build_params(a=None, b=False, c="", d="x") == {"d": "x"}
+
+    def test_keeps_zero_and_true(self):
+        params = build_params(positionIdx=0, reduceOnly=True)
+        assert params == {"positionIdx": 0, "reduceOnly": True}
+
+
+class TestToolParams:
+    async def test_zero_time_bounds_are_not_sent(self, bybit):
+        await position.get_closed_pnl("linear", start_time=0, end_time=0)
+        await account.get_transaction_log(start_time=0, end_time=1_700_000_000_000)
+
+        closed_pnl, transaction_log = (request.url.params for request in bybit.requests)
+        assert "startTime" not in closed_pnl and "endTime" not in closed_pnl
+        assert "startTime" not in transaction_log
+        assert transaction_log["endTime"] == "1700000000000"
+
+    async def test_trading_stop_forwards_empty_tp_sl(self, bybit):
+        await position.set_trading_stop("linear", "BTCUSDT", take_profit="", stop_loss="")
+
+        body = loads(bybit.requests[0].content)
+        assert body["takeProfit"] == "" and body["stopLoss"] == ""
+        assert "tpTriggerBy" not in body
+
+    async def test_trading_stop_omits_unset_tp_sl(self, bybit):
+        await position.set_trading_stop("linear", "BTCUSDT", stop_loss="60000")
+
+        body = loads(bybit.requests[0].content)
+        assert "takeProfit" not in body
+        assert body["stopLoss"] == "60000"
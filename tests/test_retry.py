@@ -0,0 +1,126 @@
+"""Tests for retry classification and backoff."""
+
+import hashlib
+import hmac
+import itertools
+import types
+
+import httpx
+import pytest
+
+from bybit_mcp import signer as signer_module
+from bybit_mcp.client import private_get
+from bybit_mcp.signer import RECV_WINDOW
+from bybit_mcp.utils.retry import MAX_ATTEMPTS, MAX_BACKOFF, Verdict, classify, with_retry
+from tests.conftest import API_KEY, API_SECRET, bybit_response
+
+_REQUEST = httpx.Request("GET", "https://api.bybit.test/v5/market/time")
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    response = httpx.Response(status, request=_REQUEST)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=_REQUEST, response=response)
+
+
+def _attempts(outcome):
+    """An async callable that fails with ``outcome`` every time, counting calls."""
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return fn, calls
+
+
+class TestClassify:
+    def test_success(self):
+        assert classify({"retCode": 0}) is Verdict.OK
+
+    def test_unexpected_exception_aborts(self):
+        assert classify(ValueError("bad json")) is Verdict.ABORT
+
+    def test_transport_error_retries(self):
+        assert classify(httpx.ConnectError("refused")) is Verdict.RETRY
+
+
+class TestWithRetry:
+    @pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+    async def test_retries_transient_status(self, status, backoffs):
+        fn, calls = _attempts(_status_error(status))
+        with pytest.raises(httpx.HTTPStatusError):
+            await with_retry(fn, idempotent=True)
+        assert len(calls) == MAX_ATTEMPTS
+        assert len(backoffs) == MAX_ATTEMPTS - 1
+
+    @pytest.mark.parametrize("code", [10002, 10006, 10016, 170007])
+    async def test_retries_transient_ret_codes(self, code, backoffs):
+        fn, calls = _attempts({"retCode": code, "retMsg": "busy"})
+        assert (await with_retry(fn, idempotent=True))["retCode"] == code
+        assert len(calls) == MAX_ATTEMPTS
+
+    @pytest.mark.parametrize("code", [10001, 10003, 110007, 170131])
+    async def test_does_not_retry_other_ret_codes(self, code, backoffs):
+        fn, calls = _attempts({"retCode": code, "retMsg": "rejected"})
+        assert (await with_retry(fn, idempotent=True))["retCode"] == code
+        assert len(calls) == 1
+        assert backoffs == []
+
+    async def test_does_not_retry_client_error_status(self, backoffs):
+        fn, calls = _attempts(_status_error(403))
+        with pytest.raises(httpx.HTTPStatusError):
+            await with_retry(fn, idempotent=True)
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize(
+        "outcome", [_status_error(503), httpx.ReadTimeout("timed out"), {"retCode": 10006}]
+    )
+    async def test_non_idempotent_never_retries(self, outcome, backoffs):
+        fn, calls = _attempts(outcome)
+        if isinstance(outcome, Exception):
+            with pytest.raises(type(outcome)):
+                await with_retry(fn, idempotent=False)
+        else:
+            await with_retry(fn, idempotent=False)
+        assert len(calls) == 1
+        assert backoffs == []
+
+    async def test_stops_retrying_on_success(self, backoffs):
+        outcomes = iter([{"retCode": 10016}, {"retCode": 0, "result": {}}])
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            return next(outcomes)
+
+        assert (await with_retry(fn, idempotent=True))["retCode"] == 0
+        assert len(calls) == 2
+
+    async def test_backoff_is_full_jitter_capped(self, backoffs):
+        fn, _ = _attempts({"retCode": 10006})
+        await with_retry(fn, idempotent=True)
+        assert all(0 <= delay <= min(MAX_BACKOFF, 0.5 * 2**i) for i, delay in enumerate(backoffs))
+
+
+class TestPrivateGetRetry:
+    async def test_resigns_with_fresh_timestamp_each_attempt(self, bybit, backoffs, monkeypatch):
+        ticks = itertools.count(1_700_000_000_000_000_000, 1_000_000)
+        clock = types.SimpleNamespace(time_ns=lambda: next(ticks))
+        monkeypatch.setattr(signer_module, "time", clock)
+        responses = iter([bybit_response(ret_code=10002), bybit_response({"list": []})])
+        bybit.handler = lambda request: next(responses)
+
+        result = await private_get("/v5/order/realtime", {"category": "linear"})
+
+        assert result["retCode"] == 0
+        first, second = bybit.requests
+        assert first.headers["X-BAPI-TIMESTAMP"] != second.headers["X-BAPI-TIMESTAMP"]
+        for request in bybit.requests:
+            message = (
+                f"{request.headers['X-BAPI-TIMESTAMP']}{API_KEY}{RECV_WINDOW}"
+                f"{request.url.query.decode()}"
+            )
+            expected = hmac.new(API_SECRET.encode(), message.encode(), hashlib.sha256).hexdigest()
+            assert request.headers["X-BAPI-SIGN"] == expected
@@ -0,0 +1,209 @@
+"""Tests for the WebSocket-backed ticker cache."""
+
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from bybit_mcp import stream as stream_module  # noqa: E402
+from bybit_mcp.stream import HOT_HITS, HOT_WINDOW, TickerStream  # noqa: E402
+
+# Bybit's documented /v5/market/tickers row for a linear symbol
+_REST_ROW = {
+    "symbol": "BTCUSDT",
+    "lastPrice": "17216.00",
+    "indexPrice": "17227.36",
+    "markPrice": "17217.33",
+    "prevPrice24h": "16926.50",
+    "price24hPcnt": "0.017103",
+    "highPrice24h": "17281.50",
+    "lowPrice24h": "16915.00",
+    "prevPrice1h": "17238.00",
+    "openInterest": "68744.761",
+    "openInterestValue": "1183601235.91",
+    "turnover24h": "1570383121.943499",
+    "volume24h": "91705.276",
+    "fundingRate": "-0.000212",
+    "nextFundingTime": "1673280000000",
+    "predictedDeliveryPrice": "",
+    "basisRate": "",
+    "deliveryFeeRate": "",
+    "deliveryTime": "0",
+    "ask1Size": "83.020",
+    "bid1Price": "17215.50",
+    "ask1Price": "17216.00",
+    "bid1Size": "84.489",
+    "basis": "",
+    "preOpenPrice": "",
+    "preQty": "",
+    "curPreListingPhase": "",
+}
+
+# Bybit's documented linear tickers push: no basis/delivery fields, plus tickDirection
+_WS_SNAPSHOT = {
+    "topic": "tickers.BTCUSDT",
+    "type": "snapshot",
+    "data": {
+        "symbol": "BTCUSDT",
+        "tickDirection": "PlusTick",
+        "price24hPcnt": "0.017103",
+        "lastPrice": "17216.00",
+        "prevPrice24h": "16926.50",
+        "highPrice24h": "17281.50",
+        "lowPrice24h": "16915.00",
+        "prevPrice1h": "17238.00",
+        "markPrice": "17217.33",
+        "indexPrice": "17227.36",
+        "openInterest": "68744.761",
+        "openInterestValue": "1183601235.91",
+        "turnover24h": "1570383121.943499",
+        "volume24h": "91705.276",
+        "nextFundingTime": "1673280000000",
+        "fundingRate": "-0.000212",
+        "bid1Price": "17215.50",
+        "bid1Size": "84.489",
+        "ask1Price": "17216.00",
+        "ask1Size": "83.020",
+    },
+    "cs": 24987956059,
+    "ts": 1673272861686,
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock for the stream; sleeping advances it instantly."""
+    fake = types.SimpleNamespace(now=1000.0, sleeps=[])
+    fake.monotonic = lambda: fake.now
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        fake.sleeps.append(delay)
+        fake.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(stream_module, "time", fake)
+    monkeypatch.setattr(stream_module.asyncio, "sleep", sleep)
+    return fake
+
+
+@pytest.fixture
+async def stream():
+    stream = TickerStream()
+    yield stream
+    await stream.close()
+
+
+def _make_hot(stream, category="linear", symbol="BTCUSDT"):
+    for _ in range(HOT_HITS):
+        assert stream.lookup(category, symbol) is None
+
+
+class TestShape:
+    async def test_streamed_result_matches_rest_shape(self, stream, clock):
+        stream._topics["linear"].add("BTCUSDT")
+        stream._apply("linear", _WS_SNAPSHOT)
+        delta = {"symbol": "BTCUSDT", "lastPrice": "17217.50"}
+        stream._apply("linear", {"topic": "tickers.BTCUSDT", "type": "delta", "data": delta})
+
+        streamed = stream.lookup("linear", "BTCUSDT")
+
+        rest_result = {"category": "linear", "list": [_REST_ROW]}
+        assert streamed.keys() == rest_result.keys()
+        (row,) = streamed["list"]
+        assert list(row) == list(_REST_ROW)
+        pushed = {**_WS_SNAPSHOT["data"], "lastPrice": "17217.50"}
+        assert row == {field: pushed.get(field, "") for field in _REST_ROW}
+
+    async def test_spot_and_option_stay_on_rest(self, stream, clock):
+        for category in ("spot", "option"):
+            for _ in range(HOT_HITS * 2):
+                assert stream.lookup(category, "BTCUSDT") is None
+        assert not stream._tasks
+        assert not stream._hits
+
+
+class TestBookkeeping:
+    async def test_unsubscribed_lookups_are_swept(self, stream, clock):
+        for i in range(100):
+            stream.lookup("linear", f"COIN{i}USDT")
+        assert len(stream._hits) == 100
+        clock.now += HOT_WINDOW + 1
+        stream.lookup("linear", "BTCUSDT")
+        assert list(stream._hits) == [("linear", "BTCUSDT")]
+        assert not stream._last_used
+
+    async def test_subscribe_send_task_is_referenced_until_done(self, stream, clock):
+        sent = asyncio.Event()
+        release = asyncio.Event()
+
+        class Socket:
+            async def send(self, message):
+                sent.set()
+                await release.wait()
+
+        stream._sockets["linear"] = Socket()
+        stream._tasks["linear"] = asyncio.get_running_loop().create_future()  # already running
+        _make_hot(stream)
+        await sent.wait()
+        assert len(stream._sends) == 1
+        release.set()
+        await asyncio.gather(*stream._sends)
+        await asyncio.sleep(0)
+        assert not stream._sends
+        stream._tasks.pop("linear").cancel()
+
+
+class TestReconnect:
+    async def test_unreachable_stream_stops_once_symbols_go_idle(self, stream, clock, monkeypatch):
+        attempts = []
+
+        def connect(url, **kwargs):
+            attempts.append(url)
+            raise OSError("network unreachable")
+
+        monkeypatch.setattr(stream_module.websockets, "connect", connect)
+        _make_hot(stream)
+        await stream._tasks["linear"]
+
+        assert len(attempts) > 1
+        assert clock.sleeps[:3] == [1.0, 2.0, 4.0]
+        assert max(clock.sleeps) <= stream_module.MAX_BACKOFF
+        assert not stream._topics["linear"]
+        assert not stream._last_used
+        assert "linear" not in stream._tasks
+
+    async def test_unexpected_error_is_logged_and_retried(self, stream, clock, monkeypatch, caplog):
+        attempts = []
+
+        def connect(url, **kwargs):
+            attempts.append(url)
+            raise ValueError("unexpected frame")
+
+        monkeypatch.setattr(stream_module.websockets, "connect", connect)
+        _make_hot(stream)
+        await stream._tasks["linear"]
+
+        assert len(attempts) > 1
+        assert "linear ticker stream failed" in caplog.text
+
+    async def test_ended_task_lets_symbol_resubscribe(self, stream, clock, monkeypatch):
+        blocked = asyncio.Event()
+
+        def connect(url, **kwargs):
+            blocked.set()
+            raise OSError("down")
+
+        monkeypatch.setattr(stream_module.websockets, "connect", connect)
+        _make_hot(stream)
+        task = stream._tasks["linear"]
+        await blocked.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert "BTCUSDT" not in stream._topics["linear"]
+        _make_hot(stream)
+        assert "BTCUSDT" in stream._topics["linear"]
+        assert stream._tasks["linear"] is not task
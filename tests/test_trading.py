@@ -0,0 +1,209 @@
+"""Tests for order placement, retries and batch splitting over a mocked Bybit API."""
+
+import httpx
+
+from bybit_mcp.tools import trading
+from bybit_mcp.utils.serialization import loads
+from tests.conftest import bybit_response
+
+
+def _orders(count: int) -> list[dict[str, str]]:
+    return [
+        {"symbol": "BTCUSDT", "side": "Buy", "orderType": "Market", "qty": str(i)}
+        for i in range(count)
+    ]
+
+
+def _batch_ok(request: httpx.Request) -> httpx.Response:
+    orders = loads(request.content)["request"]
+    placed = [{"symbol": o["symbol"], "orderId": f"id-{o['qty']}", "orderLinkId": ""} for o in orders]
+    return bybit_response(
+        {"list": placed}, retExtInfo={"list": [{"code": 0, "msg": "OK"} for _ in orders]}
+    )
+
+
+class TestBatchOrders:
+    async def test_splits_into_chunks_of_twenty(self, bybit):
+        bybit.handler = _batch_ok
+        result = await trading.batch_place_orders("linear", _orders(45))
+        sizes = [len(loads(request.content)["request"]) for request in bybit.requests]
+        assert sorted(sizes) == [5, 20, 20]
+        assert [item["orderId"] for item in result["list"]] == [f"id-{i}" for i in range(45)]
+        assert len(result["retExtInfo"]["list"]) == 45
+
+    async def test_spot_chunks_of_ten(self, bybit):
+        bybit.handler = _batch_ok
+        await trading.batch_place_orders("spot", _orders(15))
+        sizes = [len(loads(request.content)["request"]) for request in bybit.requests]
+        assert sorted(sizes) == [5, 10]
+
+    async def test_single_chunk_keeps_plain_response(self, bybit):
+        bybit.handler = _batch_ok
+        result = await trading.batch_place_orders("linear", _orders(3))
+        assert len(bybit.requests) == 1
+        assert [item["orderId"] for item in result["list"]] == ["id-0", "id-1", "id-2"]
+
+    async def test_failed_chunk_is_reported_per_order_in_place(self, bybit):
+        def handler(request):
+            first_qty = loads(request.content)["request"][0]["qty"]
+            if first_qty == "20":  # the second chunk
+                raise httpx.ConnectError("connection reset")
+            if first_qty == "40":  # the third chunk
+                return bybit_response(ret_code=10001)
+            return _batch_ok(request)
+
+        bybit.handler = handler
+        result = await trading.batch_place_orders("linear", _orders(45))
+
+        items, codes = result["list"], result["retExtInfo"]["list"]
+        assert len(items) == len(codes) == 45
+        assert [item["orderId"] for item in items[:20]] == [f"id-{i}" for i in range(20)]
+        assert all(code == {"code": 0, "msg": "OK"} for code in codes[:20])
+        placeholder = {"symbol": "BTCUSDT", "orderId": "", "orderLinkId": ""}
+        assert all(item == placeholder for item in items[20:])
+        assert all(code["code"] == -1 and "ConnectError" in code["msg"] for code in codes[20:40])
+        assert all(code == {"code": 10001, "msg": "error"} for code in codes[40:])
+        # Placement without orderLinkIds is not idempotent: the failed chunk is not resent
+        assert len(bybit.requests) == 3
+
+
+    async def test_single_chunk_transport_failure_is_error_dict(self, bybit):
+        def handler(request):
+            raise httpx.ConnectError("connection reset")
+
+        bybit.handler = handler
+        result = await trading.batch_place_orders("linear", _orders(3))
+        assert result == {"error": True, "code": -1, "message": "ConnectError: connection reset"}
+
+
+class TestPlaceOrderRecovery:
+    async def test_lost_response_is_recovered_without_resending(self, bybit, backoffs):
+        created = []
+
+        def handler(request):
+            if request.url.path == "/v5/order/create":
+                created.append(loads(request.content)["orderLinkId"])
+                raise httpx.ReadTimeout("response lost")
+            assert request.url.params["orderLinkId"] == created[0]
+            return bybit_response({"list": [{"orderId": "oid-1", "orderLinkId": created[0]}]})
+
+        bybit.handler = handler
+        result = await trading.place_order("linear", "BTCUSDT", "Buy", "Market", "0.001")
+
+        assert result == {"orderId": "oid-1", "orderLinkId": created[0]}
+        assert created[0].startswith("mcp-")
+        assert bybit.paths().count("/v5/order/create") == 1
+
+    async def test_filled_order_is_recovered_from_history(self, bybit, backoffs):
+        def handler(request):
+            if request.url.path == "/v5/order/create":
+                raise httpx.ReadTimeout("response lost")
+            if request.url.path == "/v5/order/realtime":
+                return bybit_response({"list": []})  # filled, so no longer open
+            order = {"orderId": "oid-3", "orderLinkId": "bot-8", "orderStatus": "Filled"}
+            return bybit_response({"list": [order]})
+
+        bybit.handler = handler
+        result = await trading.place_order(
+            "linear", "BTCUSDT", "Buy", "Market", "0.001", order_link_id="bot-8"
+        )
+
+        assert result == {"orderId": "oid-3", "orderLinkId": "bot-8"}
+        assert bybit.paths() == ["/v5/order/create", "/v5/order/realtime", "/v5/order/history"]
+        assert bybit.requests[2].url.params["orderLinkId"] == "bot-8"
+
+    async def test_resends_when_order_was_not_placed(self, bybit, backoffs):
+        attempts = iter([httpx.ConnectError("refused"), None])
+
+        def handler(request):
+            if request.url.path in ("/v5/order/realtime", "/v5/order/history"):
+                return bybit_response({"list": []})
+            error = next(attempts)
+            if error is not None:
+                raise error
+            return bybit_response({"orderId": "oid-2", "orderLinkId": "bot-7"})
+
+        bybit.handler = handler
+        result = await trading.place_order(
+            "linear", "BTCUSDT", "Buy", "Limit", "0.001", price="65000", order_link_id="bot-7"
+        )
+
+        assert result == {"orderId": "oid-2", "orderLinkId": "bot-7"}
+        assert bybit.paths() == [
+            "/v5/order/create",
+            "/v5/order/realtime",
+            "/v5/order/history",
+            "/v5/order/create",
+        ]
+        first, *_, second = bybit.requests
+        assert first.content == second.content  # same orderLinkId both times
+
+
+class TestCancelOrderRecovery:
+    @staticmethod
+    def _handler(status):
+        cancels = []
+
+        def handler(request):
+            if request.url.path == "/v5/order/realtime":
+                return bybit_response({"list": []})
+            if request.url.path == "/v5/order/history":
+                order = {"orderId": "oid-1", "orderLinkId": "bot-9", "orderStatus": status}
+                return bybit_response({"list": [order]})
+            cancels.append(request)
+            if len(cancels) == 1:
+                raise httpx.ReadTimeout("response lost")
+            return bybit_response(ret_code=110001)  # "order not exists"
+
+        return handler, cancels
+
+    async def test_applied_cancel_is_reported_as_success(self, bybit, backoffs):
+        bybit.handler, cancels = self._handler("Cancelled")
+
+        result = await trading.cancel_order("linear", "BTCUSDT", order_link_id="bot-9")
+
+        assert result == {"orderId": "oid-1", "orderLinkId": "bot-9"}
+        assert len(cancels) == 1
+
+    async def test_cancel_of_filled_order_is_resent(self, bybit, backoffs):
+        bybit.handler, cancels = self._handler("Filled")
+
+        result = await trading.cancel_order("linear", "BTCUSDT", order_link_id="bot-9")
+
+        assert len(cancels) == 2
+        assert result["error"] is True
+
+
+class TestAmendOrderRecovery:
+    @staticmethod
+    def _handler(order):
+        amends = []
+
+        def handler(request):
+            if request.url.path == "/v5/order/realtime":
+                return bybit_response({"list": [order]})
+            amends.append(request)
+            if len(amends) == 1:
+                raise httpx.ReadTimeout("response lost")
+            return bybit_response(ret_code=10001)  # "order not modified"
+
+        return handler, amends
+
+    async def test_applied_amend_is_reported_as_success(self, bybit, backoffs):
+        order = {"orderId": "oid-1", "orderLinkId": "", "price": "64000.00", "qty": "0.001"}
+        bybit.handler, amends = self._handler(order)
+
+        result = await trading.amend_order("linear", "BTCUSDT", order_id="oid-1", price="64000")
+
+        assert result == {"orderId": "oid-1", "orderLinkId": ""}
+        assert len(amends) == 1
+        assert bybit.requests[1].url.params["orderId"] == "oid-1"
+
+    async def test_unapplied_amend_is_resent(self, bybit, backoffs):
+        order = {"orderId": "oid-1", "orderLinkId": "", "price": "65000", "qty": "0.001"}
+        bybit.handler, amends = self._handler(order)
+
+        result = await trading.amend_order("linear", "BTCUSDT", order_id="oid-1", price="64000")
+
+        assert len(amends) == 2
+        assert result["error"] is True
@@ -0,0 +1,38 @@
+"""Tests for client-side order parameter checks."""
+
+import pytest
+
+from bybit_mcp.utils.validation import order_error
+
+
+class TestOrderError:
+    def test_accepts_well_formed_order(self):
+        assert order_error(
+            "linear",
+            side="Buy",
+            order_link_id="bot-1_a",
+            positive=(("qty", "0.001"),),
+            decimals=(("price", "65000.5"), ("stop_loss", None), ("take_profit", "")),
+        ) is None
+
+    @pytest.mark.parametrize("qty", ["", "0", "-1", "1e-3", " 1", "abc", "١٢", "0.５"])
+    def test_rejects_malformed_qty(self, qty):
+        error = order_error("linear", positive=(("qty", qty),))
+        assert error["error"] is True
+        assert error["code"] == -1
+        assert "qty" in error["message"]
+
+    def test_rejects_unknown_category_and_side(self):
+        assert "category" in order_error("futures")["message"]
+        assert "side" in order_error("spot", side="buy")["message"]
+
+    def test_restricts_categories_when_given(self):
+        assert order_error("spot", categories=frozenset({"linear", "inverse"})) is not None
+
+    def test_rejects_bad_order_link_id(self):
+        assert order_error("linear", order_link_id="x" * 37) is not None
+        assert order_error("linear", order_link_id="has space") is not None
+
+    def test_rejects_non_ascii_digits_in_decimals(self):
+        error = order_error("linear", decimals=(("price", "٦٥٠٠٠"),))
+        assert "price" in error["message"]